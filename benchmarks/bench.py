@@ -0,0 +1,229 @@
+"""Throughput of the logic classes, the 2D map and the 3D view.
+
+Usage:
+    python benchmarks/bench.py [--output results.json] [--quick]
+    python benchmarks/bench.py --save-baseline          # store benchmarks/baseline.json
+    python benchmarks/bench.py --threshold 0.2          # exit 1 if any case is >20% slower
+
+Every result is a rate (higher is better): moves, calls, renders or
+constructions per second. Cases whose optional dependency (OpenCV, Ursina)
+is not installed are reported as skipped. The 2D map is rendered with
+cv2.imshow replaced by a no-op and the 3D view is built in a windowless
+Ursina app, so the suite also runs on a headless machine.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from rubik import rubik_2x2x2, rubik_2x2x2_batch, rubik_3x3x3, rubik_3x3x3_batch  # noqa: E402
+from rubik.encoding import cubie_encoder, facelet_encoder  # noqa: E402
+from rubik.notation import MOVE_NAMES  # noqa: E402
+from rubik.render2d import image_renderer  # noqa: E402
+from rubik.transitions import transition_cache  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+CLASSES = {"3x3x3": (rubik_3x3x3, rubik_3x3x3_batch), "2x2x2": (rubik_2x2x2, rubik_2x2x2_batch)}
+# Method names in update() order
+MOVE_METHODS = ["R", "Ri", "Li", "L", "Ui", "U", "D", "Di", "F", "Fi", "Bi", "B"]
+SHUFFLE_NUM = 50
+ALGORITHM = "R U R' U' R' F R2 U' R' U' R U R' F'"
+
+
+def measure(func, units=1, repeat=3):
+    """Best rate of func() over `repeat` runs, in units per second."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return units * number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def _headless_cv2():
+    import cv2
+
+    cv2.imshow = lambda *args, **kwargs: None
+    cv2.waitKey = lambda *args, **kwargs: -1
+    return cv2
+
+
+_app = None
+
+
+def _headless_camera(rubik_class):
+    global _app
+    import rubik.camera as camera_module
+    from ursina import Ursina
+
+    _headless_cv2()
+    if _app is None:
+        _app = Ursina(window_type="none")
+    camera_module.Ursina = lambda *args, **kwargs: _app
+    return camera_module.RubikCubeCamera(rubik_class=rubik_class)
+
+
+def _render_case(rubik_class):
+    # Headless part of show_rubik_2Dmap(): repaint after one move, no window
+    from rubik.render2d import rubik_2Dmap_renderer
+
+    cube = rubik_class()
+    renderer = rubik_2Dmap_renderer(cube.cube.shape)
+    return lambda: (cube.R(), renderer.render(cube.cube))
+
+
+def _cached_case(cube, moves):
+    # A move and its inverse through a transition_cache: after the first call every lookup hits
+    cube.transitions = transition_cache(cube.n)
+    inverse = moves ^ 1
+
+    def step():
+        cube.update(moves)
+        cube.update(inverse)
+    step()
+    return step
+
+
+def _images_case(b):
+    # 4x4 pixel cells into a preallocated output, as a vision policy would take them
+    renderer = image_renderer(b.cubes.shape[1:], cell_size=4)
+    out = renderer.new_output(len(b.cubes))
+    return lambda: renderer.render(b.cubes, out)
+
+
+def _encode_case(b, encoder_class):
+    # float32 one-hot into a preallocated output
+    encoder = encoder_class(b.cubes.shape[1] // 3)
+    out = encoder.new_output(len(b.cubes))
+    return lambda: encoder.encode(b.cubes, out)
+
+
+def cases(batch_size):
+    """(name, unit, units per call, setup) where setup() returns the function to time."""
+    for size, (single, batch) in CLASSES.items():
+        for method, name in zip(MOVE_METHODS, MOVE_NAMES):
+            yield (f"{size}/move/{name}", "moves/s", 1,
+                   lambda single=single, method=method: getattr(single(shuffle_num=0), method))
+        yield (f"{size}/shuffle", "moves/s", SHUFFLE_NUM,
+               lambda single=single: lambda cube=single(shuffle_num=0): cube.shuffle(SHUFFLE_NUM))
+        yield (f"{size}/update/cached", "moves/s", 2, lambda single=single: _cached_case(single(shuffle_num=0), 0))
+        yield (f"{size}/get_state", "calls/s", 1, lambda single=single: single().get_state)
+        yield (f"{size}/apply_moves", "moves/s", len(ALGORITHM.split()),
+               lambda single=single: lambda cube=single(shuffle_num=0): cube.apply_moves(ALGORITHM))
+        # One move per call, otherwise the renderer has nothing to repaint
+        yield (f"{size}/show_rubik_2Dmap", "renders/s", 1,
+               lambda single=single: (_headless_cv2(), lambda cube=single(): (cube.R(), cube.show_rubik_2Dmap()))[1])
+        yield (f"{size}/render2d", "renders/s", 1, lambda single=single: _render_case(single))
+        yield (f"{size}/camera/init", "constructions/s", 1,
+               lambda single=single: (_headless_camera(single), lambda: _headless_camera(single))[1])
+        yield (f"{size}/camera/refresh_view", "calls/s", 1,
+               lambda single=single: _headless_camera(single).refresh_view)
+
+        moves = np.random.default_rng(0).integers(0, 12, size=batch_size)
+        yield (f"{size}/batch/update", "moves/s", batch_size,
+               lambda batch=batch, moves=moves: lambda b=batch(batch_size, shuffle_num=0): b.update(moves))
+        yield (f"{size}/batch/update/cached", "moves/s", 2 * batch_size,
+               lambda batch=batch, moves=moves: _cached_case(batch(batch_size, shuffle_num=0), moves))
+        yield (f"{size}/batch/shuffle", "moves/s", batch_size * SHUFFLE_NUM,
+               lambda batch=batch: lambda b=batch(batch_size, shuffle_num=0): b.shuffle(SHUFFLE_NUM))
+        yield (f"{size}/batch/apply_moves", "moves/s", batch_size * len(ALGORITHM.split()),
+               lambda batch=batch: lambda b=batch(batch_size, shuffle_num=0): b.apply_moves(ALGORITHM))
+        yield (f"{size}/batch/render_images", "images/s", batch_size,
+               lambda batch=batch: _images_case(batch(batch_size)))
+        yield (f"{size}/batch/encode/facelets", "states/s", batch_size,
+               lambda batch=batch: _encode_case(batch(batch_size), facelet_encoder))
+        yield (f"{size}/batch/encode/cubies", "states/s", batch_size,
+               lambda batch=batch: _encode_case(batch(batch_size), cubie_encoder))
+        yield (f"{size}/batch/get_state", "states/s", batch_size,
+               lambda batch=batch: batch(batch_size).get_state)
+        yield (f"{size}/batch/get_state_index", "states/s", batch_size,
+               lambda batch=batch: batch(batch_size).get_state_index)
+
+
+def run(batch_size=4096, repeat=3, select=None):
+    results = {}
+    for name, unit, units, setup in cases(batch_size):
+        if select and select not in name:
+            continue
+        try:
+            func = setup()
+        except ImportError as e:
+            results[name] = {"unit": unit, "value": None, "skipped": f"{e.name} not installed"}
+            continue
+        results[name] = {"unit": unit, "value": measure(func, units, repeat)}
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Names of the cases that are more than `threshold` slower than the baseline."""
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name, {}).get("value")
+        if result["value"] is None or reference is None:
+            continue
+        result["baseline"] = reference
+        result["ratio"] = result["value"] / reference
+        if result["ratio"] < 1 - threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write the results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument("--quick", action="store_true", help="one timing run per case instead of three")
+    parser.add_argument("--select", help="only run cases whose name contains this string")
+    args = parser.parse_args()
+
+    results = run(args.batch_size, 1 if args.quick else 3, args.select)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+    regressions = compare(results, baseline, args.threshold)
+
+    report = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "batch_size": args.batch_size,
+        "results": results,
+        "regressions": regressions,
+    }
+
+    print(f"{'case':<32}{'rate':>16}  {'unit':<16}{'vs baseline':>12}", file=sys.stderr)
+    for name, result in results.items():
+        if result["value"] is None:
+            print(f"{name:<32}{'skipped':>16}  ({result['skipped']})", file=sys.stderr)
+            continue
+        ratio = f"{result['ratio']:.2f}x" if "ratio" in result else ""
+        flag = "  REGRESSION" if name in regressions else ""
+        print(f"{name:<32}{result['value']:>16,.0f}  {result['unit']:<16}{ratio:>12}{flag}", file=sys.stderr)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+    elif args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved baseline to {args.baseline}", file=sys.stderr)
+
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
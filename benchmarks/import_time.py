@@ -0,0 +1,56 @@
+"""Import cost of the logic classes when spawning many worker processes.
+
+Usage:
+    python benchmarks/import_time.py [--workers 200]
+
+Each worker is a fresh interpreter that imports the given module and exits,
+which is what a process pool pays per worker. The headless import
+(`rubik_3x3x3.rubik_3x3x3`) is compared with importing the GUI stack
+(cv2 + ursina) that the scripts used to load at module top.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "python (baseline)": "pass",
+    "rubik (headless)": "from rubik_3x3x3 import rubik_3x3x3",
+    "rubik + cv2 + ursina": "import cv2, ursina; from rubik_3x3x3 import rubik_3x3x3",
+}
+
+
+def spawn_workers(code, workers):
+    """workers個のプロセスを同時に起動し、全て終了するまでの時間を返す"""
+    start = time.perf_counter()
+    procs = [
+        subprocess.Popen([sys.executable, "-c", code], cwd=ROOT,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(workers)
+    ]
+    codes = [p.wait() for p in procs]
+    elapsed = time.perf_counter() - start
+    if any(codes):
+        return None
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'case':<24}{'total [s]':>12}{'per worker [ms]':>18}")
+    for name, code in CASES.items():
+        elapsed = spawn_workers(code, args.workers)
+        if elapsed is None:
+            print(f"{name:<24}{'skipped (import failed)':>30}")
+            continue
+        print(f"{name:<24}{elapsed:>12.2f}{elapsed / args.workers * 1000:>18.1f}")
+
+
+if __name__ == "__main__":
+    main()
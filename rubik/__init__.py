@@ -0,0 +1,22 @@
+# GUI-free logic of the simulator.
+# Importing this package only needs numpy: OpenCV is loaded inside
+# show_rubik_2Dmap() and Ursina only by rubik.camera.
+from .cube_2x2x2 import rubik_2x2x2, rubik_2x2x2_batch
+from .cube_3x3x3 import rubik_3x3x3, rubik_3x3x3_batch
+from .cube_nxnxn import rubik_nxnxn, rubik_nxnxn_batch
+from .cubie import rubik_2x2x2_cubie, rubik_3x3x3_cubie
+
+# Batch class per cube size (rubik.env, rubik.dataset)
+BATCH_CLASSES = {2: rubik_2x2x2_batch, 3: rubik_3x3x3_batch}
+
+__all__ = [
+    "BATCH_CLASSES",
+    "rubik_2x2x2",
+    "rubik_2x2x2_batch",
+    "rubik_2x2x2_cubie",
+    "rubik_3x3x3",
+    "rubik_3x3x3_batch",
+    "rubik_3x3x3_cubie",
+    "rubik_nxnxn",
+    "rubik_nxnxn_batch",
+]
@@ -0,0 +1,270 @@
+from collections import deque
+
+import numpy as np
+from ursina import (
+    Entity,
+    Text,
+    Ursina,
+    Vec3,
+    camera,
+    color,
+    held_keys,
+    invoke,
+    lerp,
+    mouse,
+    scene,
+    time,
+    window,
+)
+
+from .cube_2x2x2 import rubik_2x2x2
+from .cube_3x3x3 import rubik_3x3x3
+from .notation import parse_moves
+
+# Numpad key -> update() index (R, Ri, Li, L, Ui, U, D, Di, F, Fi, Bi, B)
+KEY_MOVES = {'*': 0, '3': 1, '/': 2, '2': 3, '-': 4, '7': 5, '+': 6, '4': 7, '6': 8, '5': 9, '9': 10, '8': 11}
+# Per update() index: animated axis, angle and turned layer as (coordinate, side)
+MOVE_AXES = ['rotation_x'] * 4 + ['rotation_y'] * 4 + ['rotation_z'] * 4
+MOVE_ANGLES = [90, -90, 90, -90, -90, 90, -90, 90, 90, -90, 90, -90]
+MOVE_LAYERS = [(0, 1), (0, 1), (0, -1), (0, -1), (1, 1), (1, 1), (1, -1), (1, -1),
+               (2, -1), (2, -1), (2, 1), (2, 1)]
+# Seconds of one turn animation and until the cubes are put back, at speed 1
+ANIMATION_TIME = 0.06
+SETTLE_TIME = 0.08
+
+
+class RubikCubeCamera(Entity):
+    # Logic class that is drawn (rubik_3x3x3 or rubik_2x2x2)
+    rubik_class = rubik_3x3x3
+
+    def __init__(self, initial_position=None, rotate_speed=130,
+                 return_speed=10, save_path="", rubik_class=None, **kwargs):
+        super().__init__(**kwargs)
+        if rubik_class is not None:
+            self.rubik_class = rubik_class
+        self.save_path = save_path
+        self.rubik = self.rubik_class(save_path=self.save_path)
+        # Cubies per edge: 3 for 3x3x3, 2 for 2x2x2
+        self.size = self.rubik.cube.shape[0] // 3
+        if initial_position is None:
+            initial_position = (2 * self.size + 2, 2 * self.size + 2, -2 * self.size - 6)
+
+        self.app = Ursina()
+        self.target = Entity(model='cube', scale=self.size / np.sqrt(2), color=color.black)
+        self.rotator = Entity()
+        self.rotate_speed = rotate_speed
+        self.return_speed = return_speed
+        self.cubes = []
+        self.home_positions = []
+        # Flat grid index -> sticker Entity, and the grid the stickers currently show
+        self.stickers = {}
+        self.drawn_state = None
+        self.action_mode = False
+        # Pending update() indices; turns beyond max_animated_queue are applied without animation
+        self.move_queue = deque()
+        self.playback_speed = 1.0
+        self.max_animated_queue = 8
+        self.colors = {
+            0: color.clear, 1: color.white, 2: color.orange, 3: color.green,
+            4: color.red, 5: color.yellow, 6: color.azure
+        }
+
+        self.rubik.show_rubik_2Dmap()
+        self.draw_ursina_cube()
+
+        self.pivot = Entity(position=self.target.position)
+        camera.parent = self.pivot
+        camera.position = initial_position
+        camera.rotation_z = -5
+        camera.look_at(self.pivot)
+        self.default_rotation = self.pivot.rotation
+
+        text = (
+            "Controls:\n"
+            "Right Click + Drag : Orbit Camera\n"
+            "Release Click      : Reset Camera\n"
+            "S Key              : Save 2D Map\n\n"
+            "Cube Rotation (Numpad):\n"
+            "-----------------------\n"
+            "R : * |  R' : 3\n"
+            "L : 2   |  L' : /\n"
+            "U : 7   |  U' : -\n"
+            "D : +   |  D' : 4\n"
+            "F : 6   |  F' : 5\n"
+            "B : 9   |  B' : 8"
+        )
+        Text(text=text, position=(-0.7, 0.45), origin=(-0.5, 0.5))
+
+    def update(self):
+        self.next_move()
+        # The 2D map follows the cube once per frame instead of once per move
+        self.rubik.show_rubik_2Dmap()
+
+        if held_keys['right mouse']:
+            self.pivot.rotation_y += mouse.velocity[0] * self.rotate_speed
+            self.pivot.rotation_x -= mouse.velocity[1] * self.rotate_speed * 2
+        else:
+            self.pivot.rotation = lerp(self.pivot.rotation, self.default_rotation, time.dt * self.return_speed)
+
+    def rotate_side(self, side_name):
+        # Keys pressed during an animation are queued instead of dropped
+        self.move_queue.append(KEY_MOVES[side_name])
+        self.next_move()
+
+    def play(self, moves, speed=None):
+        """手順 ("R U R' U'" またはupdate()のインデックス列) をキューに追加して順に再生する"""
+        # Only the 12 outer face turns can be animated; a bad index would fail later in a frame callback
+        moves = parse_moves(moves, len(MOVE_LAYERS))
+        if speed is not None:
+            self.playback_speed = speed
+        self.move_queue.extend(moves)
+        self.next_move()
+
+    def next_move(self):
+        if self.action_mode or not self.move_queue:
+            return
+        # Deep queue: apply the oldest turns at once and only animate the last ones
+        if len(self.move_queue) > self.max_animated_queue:
+            while len(self.move_queue) > self.max_animated_queue:
+                self.rubik.update(self.move_queue.popleft())
+            self.refresh_view()
+        self.turn(self.move_queue.popleft())
+
+    def turn(self, rotate_index):
+        self.action_mode = True
+        self.rotator.rotation = (0, 0, 0)
+        for e in self.layers[rotate_index]:
+            e.world_parent = self.rotator
+
+        self.rubik.update(rotate_index)
+
+        # Animations get shorter as the queue grows
+        speed = self.playback_speed * (1 + len(self.move_queue) / self.max_animated_queue)
+        self.rotator.animate(MOVE_AXES[rotate_index], MOVE_ANGLES[rotate_index], duration=ANIMATION_TIME / speed)
+        invoke(self.reset_structure, delay=SETTLE_TIME / speed)
+
+    def reset_structure(self):
+        # Put the turned cubes back where they started and recolour the
+        # stickers instead, so that self.stickers keeps matching the grid
+        self.refresh_view()
+
+    def input(self, key):
+        k = key.upper()
+        if k in KEY_MOVES:
+            self.rotate_side(k)
+        elif k == "S":
+            self.rubik.save_rubik_2Dmap()
+        elif k == "R":
+            self.reset_cube_state()
+        elif k == "V":
+            self.refresh_view()
+
+    def draw_ursina_cube(self):
+        """キューブと全ステッカーのEntityを一度だけ作り、展開図のマス→ステッカーの対応を記録する"""
+        cube_state = self.rubik.cube
+        width = cube_state.shape[1]
+
+        # 3x3x3 means 27 cubes at -1, 0 and 1; 2x2x2 means 8 cubes at -0.5 and 0.5
+        n = self.size
+        h = (n - 1) / 2
+        positions = [i - h for i in range(n)]
+
+        # Cube entities by doubled (integer) position, replaces a distance() scan per sticker
+        cube_at = {}
+        for x in positions:
+            for y in positions:
+                for z in positions:
+                    c = Entity(model='cube', color=color.black, position=(x, y, z), scale=0.99 if n > 2 else 0.98)
+                    self.cubes.append(c)
+                    self.home_positions.append(Vec3(x, y, z))
+                    cube_at[(round(2 * x), round(2 * y), round(2 * z))] = c
+
+        # Cubes turned by each move: pivot is at 0, outer cubes are at +/- (size - 1) / 2
+        edge = (n - 1) / 2 - 0.5
+        self.layers = [[c for c, home in zip(self.cubes, self.home_positions) if side * home[axis] > edge]
+                       for axis, side in MOVE_LAYERS]
+
+        # Grid layout (n = size): U[0:n, n:2n], L[n:2n, 0:n], F[n:2n, n:2n],
+        #                         R[n:2n, 2n:3n], D[2n:3n, n:2n], B[2n:3n, 2n:3n]
+        faces_config = [
+            # Top (U)
+            {'slice': (0, n, n, 2 * n), 'pos': lambda r, c: Vec3(c - h, h, h - r), 'rot': (90, 0, 0)},
+            # Left (L)
+            {'slice': (n, 2 * n, 0, n), 'pos': lambda r, c: Vec3(-h, h - r, h - c), 'rot': (0, 90, 0)},
+            # Front (F)
+            {'slice': (n, 2 * n, n, 2 * n), 'pos': lambda r, c: Vec3(c - h, h - r, -h), 'rot': (0, 0, 0)},
+            # Right (R)
+            {'slice': (n, 2 * n, 2 * n, 3 * n), 'pos': lambda r, c: Vec3(h, h - r, c - h), 'rot': (0, -90, 0)},
+            # Bottom (D)
+            {'slice': (2 * n, 3 * n, n, 2 * n), 'pos': lambda r, c: Vec3(c - h, -h, r - h), 'rot': (-90, 0, 0)},
+            # Back (B)
+            {'slice': (2 * n, 3 * n, 2 * n, 3 * n), 'pos': lambda r, c: Vec3(c - h, h - r, h), 'rot': (0, 180, 0)},
+        ]
+
+        for config in faces_config:
+            rs, re, cs, ce = config['slice']
+            target_rot = Vec3(*config['rot'])
+
+            for r in range(n):
+                for c in range(n):
+                    target_pos = config['pos'](r, c)
+                    cube_entity = cube_at[tuple(round(2 * v) for v in target_pos)]
+                    sticker = Entity(
+                        parent=cube_entity,
+                        model='quad',
+                        color=self.colors[cube_state[rs + r, cs + c]],
+                        scale=0.9,
+                        texture='white_cube'
+                    )
+                    sticker.world_position = target_pos
+                    sticker.world_rotation = target_rot
+                    sticker.world_position += sticker.back * 0.6  # Slightly closer for smaller cubes
+                    self.stickers[(rs + r) * width + cs + c] = sticker
+
+        self.drawn_state = cube_state.copy()
+
+    def refresh_view(self):
+        """現在のself.rubikの状態に合わせて、色が変わったステッカーだけを塗り直す"""
+        if not self.stickers:
+            self.draw_ursina_cube()
+            return
+
+        # 1. 回転アニメーション用の親Entityとキューブの位置・向きを初期状態に戻す
+        self.rotator.rotation = (0, 0, 0)
+        for c, home in zip(self.cubes, self.home_positions):
+            c.world_parent = scene
+            c.position = home
+            c.rotation = (0, 0, 0)
+        self.action_mode = False
+
+        # 2. 前回描画した状態と異なるマスのステッカーの色だけを変える (Entityは作り直さない)
+        cube_state = self.rubik.cube.ravel()
+        for i in np.flatnonzero(cube_state != self.drawn_state.ravel()).tolist():
+            self.stickers[i].color = self.colors[cube_state[i]]
+        self.drawn_state[...] = self.rubik.cube
+
+    # ---------------------------------------------------------
+    # 【追加】完全に初期状態に戻すメソッド（論理リセット＋描画リセット）
+    # ---------------------------------------------------------
+    def reset_cube_state(self):
+        """内部データと見た目の両方を初期化する"""
+        print("Resetting Cube...")
+
+        # 内部ロジッククラスを再インスタンス化（または初期化メソッドを呼ぶ）
+        # ※引数は __init__ で受け取ったものと同じものを使う必要があります
+        # ここでは初期化時のパラメータを保持していないため、簡易的に再作成します
+        self.move_queue.clear()
+        self.rubik = self.rubik_class(save_path=self.save_path)
+        self.rubik.show_rubik_2Dmap()
+
+        # 見た目を更新
+        self.refresh_view()
+
+    def run_app(self):
+        window.color = color.dark_gray
+        window.title = f"{self.size}x{self.size} Rubik's Cube"
+        self.app.run()
+
+
+class RubikCubeCamera2x2x2(RubikCubeCamera):
+    rubik_class = rubik_2x2x2
@@ -0,0 +1,180 @@
+"""Dense integer coordinates of cubie states.
+
+All functions take cubie states (see rubik.cubie) with any leading batch
+shape and return int64 arrays.
+
+* 2x2x2: encode_2x2x2() maps a state to 0..3,674,159. With all six faces
+  turnable, the 2x2x2 grid can also be rotated as a whole (R Li == x), so
+  the index is taken after rotating the DBL corner home; decode_2x2x2()
+  returns that representative.
+* 3x3x3: 43,252,003,274,489,856,000 states do not fit into 64 bits, so
+  encode_3x3x3() returns a (corner, edge) pair of int64 arrays with
+  index = corner * EDGE_COUNT + edge.
+"""
+from math import factorial
+
+import numpy as np
+
+from .cubie import TABLES_2x2x2
+
+CORNER_COUNT = factorial(8) * 3 ** 7        # 88,179,840
+EDGE_COUNT = factorial(12) // 2 * 2 ** 11   # 490,497,638,400 (parity follows the corners)
+STATE_COUNT_2x2x2 = factorial(7) * 3 ** 6   # 3,674,160
+STATE_COUNT_3x3x3 = CORNER_COUNT * EDGE_COUNT
+
+_DBL = 6
+
+
+def perm_rank(perms):
+    """Lehmer rank of permutations of 0..n-1 along the last axis."""
+    perms = np.asarray(perms, dtype=np.int64)
+    n = perms.shape[-1]
+    rank = np.zeros(perms.shape[:-1], dtype=np.int64)
+    for i in range(n - 1):
+        digit = (perms[..., i + 1:] < perms[..., i:i + 1]).sum(axis=-1)
+        rank = rank * (n - i) + digit
+    return rank
+
+
+def perm_unrank(ranks, n):
+    ranks = np.array(ranks, dtype=np.int64)
+    perms = np.empty(ranks.shape + (n,), dtype=np.uint8)
+    available = np.ones(ranks.shape + (n,), dtype=bool)
+    for i in range(n):
+        base = factorial(n - 1 - i)
+        digit = ranks // base
+        ranks %= base
+        # position of the (digit + 1)-th element that is still available
+        pick = np.argmax(available & (np.cumsum(available, axis=-1) == digit[..., None] + 1), axis=-1)
+        perms[..., i] = pick
+        np.put_along_axis(available, pick[..., None], False, axis=-1)
+    return perms
+
+
+def perm_parity(perms):
+    perms = np.asarray(perms)
+    n = perms.shape[-1]
+    inversions = sum((perms[..., i + 1:] < perms[..., i:i + 1]).sum(axis=-1) for i in range(n - 1))
+    return inversions % 2
+
+
+def ori_index(oris, k):
+    """Base-k number of all orientations but the last (fixed by the twist sum)."""
+    oris = np.asarray(oris, dtype=np.int64)
+    index = np.zeros(oris.shape[:-1], dtype=np.int64)
+    for i in range(oris.shape[-1] - 1):
+        index = index * k + oris[..., i]
+    return index
+
+
+def ori_unindex(indices, count, k):
+    indices = np.array(indices, dtype=np.int64)
+    oris = np.empty(indices.shape + (count,), dtype=np.uint8)
+    for i in range(count - 2, -1, -1):
+        oris[..., i] = indices % k
+        indices //= k
+    oris[..., count - 1] = (-oris[..., :count - 1].astype(np.int64).sum(axis=-1)) % k
+    return oris
+
+
+def corner_coord(states):
+    """Corner permutation and orientation as 0..CORNER_COUNT-1 (lossless for both sizes)."""
+    states = np.asarray(states)
+    return perm_rank(states[..., 0:8]) * 3 ** 7 + ori_index(states[..., 8:16], 3)
+
+
+def corner_uncoord(coords):
+    coords = np.asarray(coords, dtype=np.int64)
+    states = np.empty(coords.shape + (16,), dtype=np.uint8)
+    states[..., 0:8] = perm_unrank(coords // 3 ** 7, 8)
+    states[..., 8:16] = ori_unindex(coords % 3 ** 7, 8, 3)
+    return states
+
+
+def edge_coord(states):
+    # The last Lehmer digit only carries the permutation parity, which equals
+    # the corner parity on a reachable cube, so it is dropped (// 2).
+    states = np.asarray(states)
+    return perm_rank(states[..., 16:28]) // 2 * 2 ** 11 + ori_index(states[..., 28:40], 2)
+
+
+def encode_3x3x3(states):
+    """3x3x3 cubie states -> (corner, edge) int64 arrays."""
+    return corner_coord(states), edge_coord(states)
+
+
+def decode_3x3x3(corner, edge):
+    corner = np.asarray(corner, dtype=np.int64)
+    edge = np.asarray(edge, dtype=np.int64)
+    states = np.empty(np.broadcast_shapes(corner.shape, edge.shape) + (40,), dtype=np.uint8)
+    states[..., 0:16] = corner_uncoord(corner)
+    ep = perm_unrank(edge // 2 ** 11 * 2, 12)
+    # Restore the dropped parity digit by swapping the last two edges
+    odd = perm_parity(ep) != perm_parity(states[..., 0:8])
+    last = ep[..., 10].copy()
+    ep[..., 10] = np.where(odd, ep[..., 11], last)
+    ep[..., 11] = np.where(odd, last, ep[..., 11])
+    states[..., 16:28] = ep
+    states[..., 28:40] = ori_unindex(edge % 2 ** 11, 12, 2)
+    return states
+
+
+def _whole_cube_rotations():
+    """The 24 whole-cube rotations of the 2x2x2 as corner states, built from R Li, U Di, F Bi."""
+    tables = TABLES_2x2x2
+    rotations = {tables.solved_state.tobytes(): tables.solved_state}
+    frontier = [tables.solved_state]
+    while frontier:
+        state = frontier.pop()
+        for pair in ((0, 2), (5, 7), (8, 10)):
+            rotated = state
+            for m in pair:
+                rotated = tables.move(rotated, m)
+            if rotated.tobytes() not in rotations:
+                rotations[rotated.tobytes()] = rotated
+                frontier.append(rotated)
+    rotations = np.array(list(rotations.values()))
+    # ROTATION_TO_HOME[p, o]: rotation that brings the DBL cubie from slot p
+    # with orientation o back to DBL with orientation 0
+    to_home = np.empty((8, 3), dtype=np.intp)
+    for r, rotation in enumerate(rotations):
+        to_home[rotation[_DBL], (-int(rotation[8 + _DBL])) % 3] = r
+    return rotations, to_home
+
+
+ROTATIONS_2x2x2, ROTATION_TO_HOME = _whole_cube_rotations()
+
+
+def reduce_2x2x2(states):
+    """Rotate 2x2x2 states as a whole so that the DBL corner is solved."""
+    states = np.asarray(states)
+    slot = np.argmax(states[..., 0:8] == _DBL, axis=-1)
+    ori = np.take_along_axis(states[..., 8:16], slot[..., None], axis=-1)[..., 0]
+    rotation = ROTATIONS_2x2x2[ROTATION_TO_HOME[slot, ori]]
+    cp = np.take_along_axis(states[..., 0:8], rotation[..., 0:8].astype(np.intp), axis=-1)
+    co = np.take_along_axis(states[..., 8:16], rotation[..., 0:8].astype(np.intp), axis=-1)
+    reduced = np.empty_like(states)
+    reduced[..., 0:8] = cp
+    reduced[..., 8:16] = (co + rotation[..., 8:16]) % 3
+    return reduced
+
+
+def encode_2x2x2(states):
+    """2x2x2 cubie states -> 0..3,674,159 (same index for whole-cube rotations)."""
+    reduced = reduce_2x2x2(states).astype(np.int64)
+    # 7 remaining corners: slots 0-5 and 7 hold cubies 0-5 and 7
+    cp = np.delete(reduced[..., 0:8], _DBL, axis=-1)
+    cp[cp == 7] = _DBL
+    co = np.delete(reduced[..., 8:16], _DBL, axis=-1)
+    return perm_rank(cp) * 3 ** 6 + ori_index(co, 3)
+
+
+def decode_2x2x2(indices):
+    indices = np.asarray(indices, dtype=np.int64)
+    cp = perm_unrank(indices // 3 ** 6, 7)
+    cp[cp == _DBL] = 7
+    co = ori_unindex(indices % 3 ** 6, 7, 3)
+    states = np.empty(indices.shape + (16,), dtype=np.uint8)
+    states[..., 0:8] = np.insert(cp, _DBL, _DBL, axis=-1)
+    states[..., 8:16] = np.insert(co, _DBL, 0, axis=-1)
+    return states
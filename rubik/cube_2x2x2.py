@@ -0,0 +1,42 @@
+from . import cube_nxnxn
+from .cube_nxnxn import SEQUENCE_CACHE_SIZE, rubik_nxnxn, rubik_nxnxn_batch  # noqa: F401
+
+# MOVE_PERMS[i] is a (6, 6) array of flat indices: cube_new = cube_old.flat[MOVE_PERMS[i]]
+# (the outer face moves generated by cube_nxnxn.move_tables)
+MOVE_PERMS = cube_nxnxn.move_tables(2)[:12]
+
+
+def compose_moves(rotate_indices):
+    """update()のインデックス列を1つの置換に合成する (new = old.flat[perm])"""
+    return cube_nxnxn.compose_moves(2, rotate_indices)
+
+
+def compile_sequence(moves):
+    """"R U R' U'" またはupdate()のインデックス列を合成済みの置換にする (LRUキャッシュ付き)"""
+    return cube_nxnxn.compile_sequence(2, moves)
+
+
+class rubik_2x2x2(rubik_nxnxn):
+    def __init__(self, save_path="", shuffle_num=50, save_index=-1):
+        super().__init__(2, save_path, shuffle_num, save_index)
+
+    def get_state_index(self):
+        # 状態を 0 .. 3,674,159 の整数に変換する (キューブ全体の持ち替えは同じ値)
+        from .coord import encode_2x2x2
+        from .cubie import TABLES_2x2x2
+
+        return int(encode_2x2x2(TABLES_2x2x2.from_cube(self.cube)))
+
+
+class rubik_2x2x2_batch(rubik_nxnxn_batch):
+    """N個のキューブを (N, H, W) 配列でまとめて保持し、1回の演算で全て回転させる"""
+
+    def __init__(self, batch_size, shuffle_num=50, seed=None):
+        super().__init__(2, batch_size, shuffle_num, seed)
+
+    def get_state_index(self):
+        # キューブごとの 0 .. 3,674,159 の整数 (int64配列)
+        from .coord import encode_2x2x2
+        from .cubie import TABLES_2x2x2
+
+        return encode_2x2x2(TABLES_2x2x2.from_cube(self.cubes))
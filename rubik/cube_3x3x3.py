@@ -0,0 +1,43 @@
+from . import cube_nxnxn
+from .cube_nxnxn import SEQUENCE_CACHE_SIZE, rubik_nxnxn, rubik_nxnxn_batch  # noqa: F401
+
+# MOVE_PERMS[i] is a (9, 9) array of flat indices: cube_new = cube_old.flat[MOVE_PERMS[i]]
+# (the outer face moves generated by cube_nxnxn.move_tables)
+MOVE_PERMS = cube_nxnxn.move_tables(3)[:12]
+
+
+def compose_moves(rotate_indices):
+    """update()のインデックス列を1つの置換に合成する (new = old.flat[perm])"""
+    return cube_nxnxn.compose_moves(3, rotate_indices)
+
+
+def compile_sequence(moves):
+    """"R U R' U'" またはupdate()のインデックス列を合成済みの置換にする (LRUキャッシュ付き)"""
+    return cube_nxnxn.compile_sequence(3, moves)
+
+
+class rubik_3x3x3(rubik_nxnxn):
+    def __init__(self, save_path="", shuffle_num=50, save_index=-1):
+        super().__init__(3, save_path, shuffle_num, save_index)
+
+    def get_state_index(self):
+        # 状態を密な整数 (0 .. 4.3e19-1) に変換する。64bitに収まらないためPythonのint
+        from .coord import EDGE_COUNT, encode_3x3x3
+        from .cubie import TABLES_3x3x3
+
+        corner, edge = encode_3x3x3(TABLES_3x3x3.from_cube(self.cube))
+        return int(corner) * EDGE_COUNT + int(edge)
+
+
+class rubik_3x3x3_batch(rubik_nxnxn_batch):
+    """N個のキューブを (N, H, W) 配列でまとめて保持し、1回の演算で全て回転させる"""
+
+    def __init__(self, batch_size, shuffle_num=50, seed=None):
+        super().__init__(3, batch_size, shuffle_num, seed)
+
+    def get_state_index(self):
+        # (corner, edge) のint64配列の組。rubik_3x3x3.get_state_index() == corner * EDGE_COUNT + edge
+        from .coord import encode_3x3x3
+        from .cubie import TABLES_3x3x3
+
+        return encode_3x3x3(TABLES_3x3x3.from_cube(self.cubes))
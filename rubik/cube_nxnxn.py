@@ -0,0 +1,359 @@
+"""NxNxN cube with move tables generated from the cube geometry.
+
+Moves (update() indices) of an NxNxN cube:
+* 0 .. 11: the outer faces in the order of rubik_3x3x3.update()
+  (R, Ri, Li, L, Ui, U, D, Di, F, Fi, Bi, B),
+* 12 ..: the inner slices, two per slice: 12 + 2 * (axis * (n - 2) + depth - 1)
+  turns the slice `depth` layers in from R (axis 0), U (axis 1) or F (axis 2)
+  the same way as that face, the next index turns it back.
+  On a 3x3x3 these are M', M, E', E, S, S'.
+
+The inverse of move m is always m ^ 1.
+"""
+import functools
+import random
+
+import numpy as np
+
+from .features import CORNER, EDGE, tables_for
+from .geometry import FACE_NAMES, FACE_NORMALS, facelet_table, solved_grid
+from .notation import MOVE_NAMES, parse_moves
+from .scramble import scramble_moves
+
+# (face, inverse) of the outer moves in update() order; faces are U, L, F, R, D, B (geometry.py)
+OUTER_MOVES = [(3, 0), (3, 1), (1, 1), (1, 0), (0, 1), (0, 0), (4, 0), (4, 1), (2, 0), (2, 1), (5, 1), (5, 0)]
+# Reference face of the inner slices of each axis: R, U, F
+SLICE_FACES = [3, 0, 2]
+
+# Compiled move sequences kept by compile_sequence()
+SEQUENCE_CACHE_SIZE = 1024
+
+
+def move_count(n):
+    return 12 + 6 * (n - 2)
+
+
+def move_layers(n):
+    """(normal, doubled layer coordinate, inverse) of every move; the layer turned is normal . position == coordinate"""
+    layers = [(FACE_NORMALS[face], n - 1, inverse) for face, inverse in OUTER_MOVES]
+    for face in SLICE_FACES:
+        for depth in range(1, n - 1):
+            layers += [(FACE_NORMALS[face], n - 1 - 2 * depth, inverse) for inverse in (0, 1)]
+    return layers
+
+
+def move_axes(n):
+    """Axis (0: x, 1: y, 2: z) of every move; moves on one axis commute unless they turn the same layer"""
+    return [int(np.flatnonzero(normal)[0]) for normal, _, _ in move_layers(n)]
+
+
+def move_names(n):
+    # Inner slices in SiGN notation: 2R is the second layer from R, turned like R
+    names = list(MOVE_NAMES)
+    for face in SLICE_FACES:
+        for depth in range(2, n):
+            names += [f"{depth}{FACE_NAMES[face]}", f"{depth}{FACE_NAMES[face]}'"]
+    return names
+
+
+def generate_move(n, normal, layer, inverse):
+    """(3n, 3n) permutation of one layer turn: cube_new = cube_old.flat[perm]"""
+    flat, faces, positions = facelet_table(n)
+    normals = FACE_NORMALS[faces]
+    # Quarter turn of the world (x: right, y: up, z: back) about normal, clockwise seen from outside
+    sign = -1 if inverse else 1
+    turned = lambda v: normal * (v @ normal)[:, None] + sign * np.cross(normal, v)  # noqa: E731
+
+    # A sticker is identified by its cubie position and the direction it faces
+    index = {(tuple(p), tuple(q)): f for f, p, q in zip(flat.tolist(), positions.tolist(), normals.tolist())}
+    moving = positions @ normal == layer
+    perm = np.arange(9 * n * n, dtype=np.intp)
+    for f, p, q in zip(flat[moving].tolist(), turned(positions[moving]).tolist(), turned(normals[moving]).tolist()):
+        perm[index[(tuple(p), tuple(q))]] = f
+    return perm.reshape(3 * n, 3 * n)
+
+
+@functools.lru_cache(maxsize=None)
+def move_tables(n):
+    """(move_count(n), 3n, 3n) read-only array of all move permutations, built once per n"""
+    if n < 2:
+        raise ValueError(f"an NxNxN cube needs n >= 2, got {n}")
+    perms = np.stack([generate_move(n, *layer) for layer in move_layers(n)])
+    perms.setflags(write=False)
+    return perms
+
+
+def compose_moves(n, rotate_indices):
+    """update()のインデックス列を1つの置換に合成する (new = old.flat[perm])"""
+    move_perms = move_tables(n)
+    perm = np.arange(9 * n * n, dtype=np.intp).reshape(3 * n, 3 * n)
+    for rotate_index in rotate_indices:
+        perm = perm.ravel()[move_perms[rotate_index]]
+    return perm
+
+
+@functools.lru_cache(maxsize=SEQUENCE_CACHE_SIZE)
+def _compiled_sequence(n, rotate_indices):
+    perm = compose_moves(n, rotate_indices)
+    perm.setflags(write=False)
+    return perm
+
+
+def compile_sequence(n, moves):
+    """"R U R' U'" またはupdate()のインデックス列を合成済みの置換にする (LRUキャッシュ付き)"""
+    return _compiled_sequence(n, parse_moves(moves, len(move_tables(n))))
+
+
+class rubik_nxnxn:
+    """NxNxNキューブ ((3n, 3n) の展開図)。回転表は move_tables(n) で生成し、nごとに共有する"""
+
+    def __init__(self, n=3, save_path="", shuffle_num=50, save_index=-1):
+        self.n = n
+        self.move_perms = move_tables(n)
+        self.save_path = ""
+        if save_path:
+            # Trajectory log (record save_index) or an old cube_*.pkl save
+            from .trajectory import load_cube
+            self.cube = load_cube(save_path, save_index)
+        else:
+            # Layout:
+            #       [U]
+            #    [L][F][R]
+            #       [D][B]
+            # 1:White(U), 2:Orange(L), 3:Green(F), 4:Red(R), 5:Yellow(D), 6:Blue(B)
+            self.cube = solved_grid(n)
+        self.solved_cube = solved_grid(n)
+
+        # Scratch buffer for apply_permutation()
+        self._buffer = np.empty_like(self.cube)
+        # 2D map renderer, created by the first show_rubik_2Dmap()
+        self._renderer = None
+        # Zobrist hash, kept up to date by update() once state_hash() has been called
+        self._hash = None
+        # Optional transition_cache that update() goes through (rubik/transitions.py)
+        self.transitions = None
+        if not save_path:
+            self.shuffle(shuffle_num)
+
+    def shuffle(self, shuffle_num=50, rng=None):
+        # rng: numpy Generator or seed. Without one the seed comes from the
+        # random module, so random.seed() still makes shuffles reproducible.
+        if rng is None:
+            rng = random.getrandbits(64)
+        self.apply_permutation(compose_moves(self.n, scramble_moves(rng, 1, shuffle_num, self.n)[0]))
+
+    def apply_permutation(self, perm):
+        # One gather into the scratch buffer, then copy back in place so that
+        # outside references to self.cube stay valid.
+        np.take(self.cube, perm, out=self._buffer)
+        self.cube[...] = self._buffer
+        self._hash = None
+
+    def set_cube(self, grid, state_hash=None):
+        # Overwrite the state in place; state_hash: its Zobrist hash if known
+        self.cube[...] = grid
+        self._hash = state_hash
+
+    # --- Rotation Logic (outer faces, see move_tables) ---
+    def R(self):
+        self.apply_permutation(self.move_perms[0])
+
+    def Ri(self):
+        self.apply_permutation(self.move_perms[1])
+
+    def Li(self):
+        self.apply_permutation(self.move_perms[2])
+
+    def L(self):
+        self.apply_permutation(self.move_perms[3])
+
+    def Ui(self):
+        self.apply_permutation(self.move_perms[4])
+
+    def U(self):
+        self.apply_permutation(self.move_perms[5])
+
+    def D(self):
+        self.apply_permutation(self.move_perms[6])
+
+    def Di(self):
+        self.apply_permutation(self.move_perms[7])
+
+    def F(self):
+        self.apply_permutation(self.move_perms[8])
+
+    def Fi(self):
+        self.apply_permutation(self.move_perms[9])
+
+    def Bi(self):
+        self.apply_permutation(self.move_perms[10])
+
+    def B(self):
+        self.apply_permutation(self.move_perms[11])
+
+    def get_state(self):
+        # 展開図の配列全体をバイト列化して一意なIDとする
+        return self.cube.tobytes()
+
+    def update(self, rotate_index):
+        # rotate_index: 0 .. 11 outer faces, 12 .. inner slices (module docstring)
+        if self.transitions is not None:
+            self.transitions.step(self, rotate_index)
+        else:
+            self._turn(rotate_index)
+
+    def _turn(self, rotate_index):
+        state_hash = self._hash
+        if state_hash is not None:
+            state_hash ^= self._zobrist.delta_one(self.cube, rotate_index)
+        self.apply_permutation(self.move_perms[rotate_index])
+        self._hash = state_hash
+
+    def state_hash(self):
+        """64bitのZobristハッシュ (rubik/zobrist.py)。以降の update() では動いたステッカー分だけ更新する"""
+        if self._hash is None:
+            from .zobrist import tables_for_hash
+            self._zobrist = tables_for_hash(self.n)
+            self._hash = int(self._zobrist.hash_grids(self.cube[None])[0])
+        return self._hash
+
+    def apply_moves(self, moves):
+        # 手順全体を1回のgatherで適用する (compile_sequence を参照)
+        self.apply_permutation(compile_sequence(self.n, moves))
+
+    def _features(self):
+        # Computed on demand from the current grid (a few gathers, features.feature_tables)
+        faces, kinds = tables_for(self.n).compute(self.cube[None])
+        return faces[0], kinds[0]
+
+    def is_solved(self):
+        # 全ての面が1色 (2x2x2 は全体の持ち替えも完成とみなす、features.feature_tables.solved)
+        return bool(tables_for(self.n).solved(self.cube[None])[0])
+
+    def correct_facelets(self):
+        # 面 (U, L, F, R, D, B) ごとの正しい色のステッカー数
+        return self._features()[0]
+
+    def solved_corners(self):
+        return int(self._features()[1][CORNER])
+
+    def solved_edges(self):
+        return int(self._features()[1][EDGE])
+
+    def show_rubik_2Dmap(self):
+        # 常駐バッファに変化した面だけを描き直し、表示は max_fps に間引く (rubik/render2d.py)
+        if self._renderer is None:
+            from .render2d import rubik_2Dmap_renderer
+            self._renderer = rubik_2Dmap_renderer(self.cube.shape)
+        self._renderer.show(self.cube)
+
+    def save_rubik_2Dmap(self):
+        # savefiles/cube_NxNxN.traj に1レコード追記する (rubik/trajectory.py)
+        from .trajectory import log_path, trajectory_log
+
+        path = log_path(self.n)
+        with trajectory_log(path, self.cube.shape) as log:
+            index = log.append(self.cube)
+
+        print(f"Successfully saved 2D Rubik map ({path} #{index})")
+
+
+class rubik_nxnxn_batch:
+    """N個のキューブを (N, H, W) 配列でまとめて保持し、1回の演算で全て回転させる"""
+
+    def __init__(self, n, batch_size, shuffle_num=50, seed=None):
+        self.n = n
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.move_perms = move_tables(n)
+        self.solved_cube = solved_grid(n)
+        self.cubes = np.empty((batch_size,) + self.solved_cube.shape, dtype=np.uint8)
+
+        # Preallocated work arrays for update(): gather index, row offsets and output
+        cells = self.solved_cube.size
+        self._flat_perms = self.move_perms.reshape(len(self.move_perms), cells)
+        self._offsets = (np.arange(batch_size, dtype=np.intp) * cells)[:, None]
+        self._index = np.empty((batch_size, cells), dtype=np.intp)
+        self._buffer = np.empty((batch_size, cells), dtype=np.uint8)
+        # Zobrist hashes, kept up to date by update() and reset() once state_hash() has been called
+        self._hashes = None
+        # Optional transition_cache that update() goes through (rubik/transitions.py)
+        self.transitions = None
+
+        self.reset()
+        self.shuffle(shuffle_num)
+
+    def reset(self, mask=None):
+        # mask: bool array or index array of the cubes to reset (None = all)
+        if mask is None:
+            self.cubes[...] = self.solved_cube
+        else:
+            self.cubes[mask] = self.solved_cube
+        if self._hashes is not None:
+            self._hashes[slice(None) if mask is None else mask] = self._solved_hash
+
+    def shuffle(self, shuffle_num=50):
+        # 打ち消し・重複のない手順で全キューブを同時にスクランブルする
+        for rotate_indices in scramble_moves(self.rng, self.batch_size, shuffle_num, self.n).T:
+            self._turn(rotate_indices)
+
+    def update(self, rotate_indices):
+        # rotate_indices: int array of shape (N,), one update() index per cube
+        if self.transitions is not None:
+            self.transitions.step_batch(self, rotate_indices)
+        else:
+            self._turn(rotate_indices)
+
+    def _turn(self, rotate_indices):
+        if self._hashes is not None:
+            self._hashes ^= self._zobrist.delta(self.cubes, rotate_indices)
+        np.take(self._flat_perms, rotate_indices, axis=0, out=self._index)
+        self._index += self._offsets
+        np.take(self.cubes, self._index, out=self._buffer)
+        self.cubes.reshape(self._buffer.shape)[...] = self._buffer
+
+    def set_cubes(self, indices, grids, hashes=None):
+        # Overwrite the cubes at indices with (len(indices), 3n, 3n) grids; hashes: theirs if known
+        self.cubes[indices] = grids
+        if self._hashes is not None:
+            self._hashes[indices] = self._zobrist.hash_grids(self.cubes[indices]) if hashes is None else hashes
+
+    def _turned(self, rows, rotate_indices):
+        # (grids, hashes) the cubes in rows would have after rotate_indices (transition_cache misses)
+        cubes = self.cubes[rows]
+        hashes = self.state_hash()[rows] ^ self._zobrist.delta(cubes, rotate_indices)
+        flat = cubes.reshape(len(rows), -1)
+        return np.take_along_axis(flat, self._flat_perms[rotate_indices], axis=1).reshape(cubes.shape), hashes
+
+    def apply_moves(self, moves):
+        # 同じ手順を全キューブに1回のgatherで適用する
+        perm = compile_sequence(self.n, moves).ravel()
+        np.take(self.cubes.reshape(self._buffer.shape), perm, axis=1, out=self._buffer)
+        self.cubes.reshape(self._buffer.shape)[...] = self._buffer
+        self._hashes = None
+
+    def state_hash(self):
+        """(N,) uint64 のZobristハッシュ。以降の update() / reset() / set_cubes() で更新する"""
+        if self._hashes is None:
+            from .zobrist import tables_for_hash
+            self._zobrist = tables_for_hash(self.n)
+            self._solved_hash = self._zobrist.hash_grids(self.solved_cube[None])[0]
+            self._hashes = self._zobrist.hash_grids(self.cubes)
+        return self._hashes.copy()
+
+    def is_solved(self):
+        return tables_for(self.n).solved(self.cubes)
+
+    def correct_facelets(self):
+        # (N, 6): 面 (U, L, F, R, D, B) ごとの正しい色のステッカー数
+        return tables_for(self.n).compute(self.cubes)[0]
+
+    def solved_corners(self):
+        return tables_for(self.n).compute(self.cubes)[1][:, CORNER]
+
+    def solved_edges(self):
+        return tables_for(self.n).compute(self.cubes)[1][:, EDGE]
+
+    def get_state(self):
+        # rubik_nxnxn.get_state() と同じバイト列をキューブごとに返す
+        return [cube.tobytes() for cube in self.cubes]
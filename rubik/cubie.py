@@ -0,0 +1,205 @@
+import numpy as np
+
+from . import cube_2x2x2, cube_3x3x3
+from .features import tables_for
+from .geometry import FACE_NORMALS, facelet_table, solved_grid
+
+# Corner / edge slots as signs of the cubie centre (x: right, y: up, z: back).
+# Order follows the usual URF, UFL, ... convention.
+CORNER_SLOTS = [
+    (1, 1, -1),    # URF
+    (-1, 1, -1),   # UFL
+    (-1, 1, 1),    # ULB
+    (1, 1, 1),     # UBR
+    (1, -1, -1),   # DFR
+    (-1, -1, -1),  # DLF
+    (-1, -1, 1),   # DBL
+    (1, -1, 1),    # DRB
+]
+EDGE_SLOTS = [
+    (1, 1, 0),    # UR
+    (0, 1, -1),   # UF
+    (-1, 1, 0),   # UL
+    (0, 1, 1),    # UB
+    (1, -1, 0),   # DR
+    (0, -1, -1),  # DF
+    (-1, -1, 0),  # DL
+    (0, -1, 1),   # DB
+    (1, 0, -1),   # FR
+    (-1, 0, -1),  # FL
+    (-1, 0, 1),   # BL
+    (1, 0, 1),    # BR
+]
+
+# Faces that hold the reference sticker of a cubie: U/D, then F/B for middle-layer edges
+_REFERENCE_FACES = [(0, 4), (2, 5)]
+
+
+def _slot_facelets(n, slots):
+    """Grid indices of the stickers of every slot, reference sticker first.
+
+    Corner stickers follow one fixed handedness so that a twist is a cyclic shift.
+    """
+    flat, faces, positions = facelet_table(n)
+    facelets = []
+    for signs in slots:
+        sel = np.flatnonzero((positions == np.array(signs) * (n - 1)).all(axis=1))
+        sel = sorted(sel, key=lambda i: next(
+            (rank for rank, ref in enumerate(_REFERENCE_FACES) if faces[i] in ref), 2))
+        if len(sel) == 3 and round(np.linalg.det(FACE_NORMALS[faces[sel]])) < 0:
+            sel[1], sel[2] = sel[2], sel[1]
+        facelets.append(flat[sel])
+    return np.array(facelets, dtype=np.intp)
+
+
+class cubie_tables:
+    """グリッド (self.cube) とキュービー表現の変換表および回転表
+
+    A state is a uint8 vector: corner permutation (8), corner orientation (8)
+    and, for the 3x3x3, edge permutation (12) and edge orientation (12).
+    cp[j] is the cubie sitting in slot j and co[j] tells which of the slot's
+    stickers shows that cubie's reference (U/D) colour.
+    """
+
+    def __init__(self, n, move_perms):
+        self.n = n
+        self.solved_cube = solved_grid(n)
+        solved_flat = self.solved_cube.ravel()
+
+        # (facelets, colours, sticker lookup, LUT cubie, LUT orientation) per piece type
+        self.pieces = []
+        slot_sets = [CORNER_SLOTS] + ([EDGE_SLOTS] if n == 3 else [])
+        offset = 0
+        for slots in slot_sets:
+            facelets = _slot_facelets(n, slots)
+            count, k = facelets.shape
+            colors = solved_flat[facelets]
+            # sticker[o, i]: which cubie sticker lands on slot sticker i at orientation o
+            sticker = (np.arange(k)[None, :] - np.arange(k)[:, None]) % k
+            lut_p = np.full(7 ** k, 255, dtype=np.uint8)
+            lut_o = np.full(7 ** k, 255, dtype=np.uint8)
+            for cubie in range(count):
+                for o in range(k):
+                    code = 0
+                    for c in colors[cubie, sticker[o]]:
+                        code = code * 7 + int(c)
+                    lut_p[code] = cubie
+                    lut_o[code] = o
+            self.pieces.append((offset, count, k, facelets, colors, sticker, lut_p, lut_o))
+            offset += 2 * count
+        self.state_size = offset
+
+        self.solved_state = self.from_cube(self.solved_cube)
+        self.solved_state.setflags(write=False)
+
+        # Move m: new = move_table[m, slot, state[move_gather[m]]]
+        values = 12
+        self.move_gather = np.empty((len(move_perms), offset), dtype=np.intp)
+        self.move_table = np.empty((len(move_perms), offset, values), dtype=np.uint8)
+        for m, perm in enumerate(move_perms):
+            moved = self.from_cube(solved_flat[perm])
+            for start, count, k, *_ in self.pieces:
+                cp = moved[start:start + count].astype(np.intp)
+                co = moved[start + count:start + 2 * count]
+                self.move_gather[m, start:start + count] = start + cp
+                self.move_gather[m, start + count:start + 2 * count] = start + count + cp
+                self.move_table[m, start:start + count] = np.arange(values)
+                self.move_table[m, start + count:start + 2 * count] = \
+                    (np.arange(values)[None, :] + co[:, None]) % k
+        self.move_gather.setflags(write=False)
+        self.move_table.setflags(write=False)
+        self.slots = np.arange(offset)
+
+    def from_cube(self, cubes):
+        """(..., 3n, 3n) のグリッドをキュービー表現 (..., state_size) に変換する"""
+        cubes = np.asarray(cubes)
+        flat = cubes.reshape(cubes.shape[:-2] + (-1,))
+        states = np.empty(flat.shape[:-1] + (self.state_size,), dtype=np.uint8)
+        for start, count, k, facelets, _, _, lut_p, lut_o in self.pieces:
+            stickers = flat[..., facelets].astype(np.intp)
+            code = stickers[..., 0]
+            for i in range(1, k):
+                code = code * 7 + stickers[..., i]
+            states[..., start:start + count] = lut_p[code]
+            states[..., start + count:start + 2 * count] = lut_o[code]
+        if (states == 255).any():
+            raise ValueError("cube contains a sticker combination that is not a valid cubie")
+        return states
+
+    def to_cube(self, states):
+        """キュービー表現 (..., state_size) をグリッド (..., 3n, 3n) に戻す"""
+        states = np.asarray(states)
+        cubes = np.empty(states.shape[:-1] + self.solved_cube.shape, dtype=np.uint8)
+        cubes[...] = self.solved_cube
+        flat = cubes.reshape(states.shape[:-1] + (-1,))
+        for start, count, k, facelets, colors, sticker, _, _ in self.pieces:
+            cp = states[..., start:start + count, None]
+            co = states[..., start + count:start + 2 * count]
+            flat[..., facelets] = colors[cp, sticker[co]]
+        return cubes
+
+    def move(self, states, rotate_indices):
+        """Apply one update() index per state (batched table lookup)."""
+        rotate_indices = np.asarray(rotate_indices)[..., None]
+        gathered = np.take_along_axis(states, self.move_gather[rotate_indices[..., 0]], axis=-1)
+        return self.move_table[rotate_indices, self.slots, gathered]
+
+
+TABLES_3x3x3 = cubie_tables(3, cube_3x3x3.MOVE_PERMS)
+TABLES_2x2x2 = cubie_tables(2, cube_2x2x2.MOVE_PERMS)
+CUBIE_TABLES = {2: TABLES_2x2x2, 3: TABLES_3x3x3}
+
+
+class _cubie_state:
+    tables = None
+
+    def __init__(self, state=None):
+        if state is None:
+            self.state = self.tables.solved_state.copy()
+        else:
+            self.state = np.array(state, dtype=np.uint8)
+
+    @classmethod
+    def from_cube(cls, cube):
+        return cls(cls.tables.from_cube(cube))
+
+    def to_cube(self):
+        return self.tables.to_cube(self.state)
+
+    def update(self, rotate_index):
+        tables = self.tables
+        self.state = tables.move_table[rotate_index, tables.slots,
+                                       self.state[tables.move_gather[rotate_index]]]
+
+    def is_solved(self):
+        # Same test as rubik_nxnxn.is_solved(): every face one colour
+        return bool(tables_for(self.tables.n).solved(self.to_cube()[None])[0])
+
+    def get_state(self):
+        return self.state.tobytes()
+
+    @property
+    def cp(self):
+        return self.state[0:8]
+
+    @property
+    def co(self):
+        return self.state[8:16]
+
+
+class rubik_3x3x3_cubie(_cubie_state):
+    """8コーナー + 12エッジの順列・向きで表した3x3x3 (40 bytes)"""
+    tables = TABLES_3x3x3
+
+    @property
+    def ep(self):
+        return self.state[16:28]
+
+    @property
+    def eo(self):
+        return self.state[28:40]
+
+
+class rubik_2x2x2_cubie(_cubie_state):
+    """8コーナーの順列・向きで表した2x2x2 (16 bytes)"""
+    tables = TABLES_2x2x2
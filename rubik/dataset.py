@@ -0,0 +1,164 @@
+"""Sharded random-walk datasets of (state, scramble depth, last move).
+
+Generate (one process per shard, shards written straight to disk):
+    python -m rubik.dataset OUT_DIR --size 3 --samples 100000000 --shards 64 --depth 26
+
+Each shard is three .npy files plus an entry in OUT_DIR/manifest.json:
+    shard_00000_states.npy      (count, 9, 9) grids or (count, 40) cubie states, uint8
+    shard_00000_depth.npy       number of moves applied, uint8
+    shard_00000_last_move.npy   update() index of the last move, uint8
+
+Walks never undo or merge moves (see rubik.scramble), so depth is a
+closer upper bound of the distance to solved.
+
+Shard i is seeded from SeedSequence(seed).spawn(shards)[i], so its content
+does not depend on the number of worker processes. Read back with
+iter_samples(), which memory-maps one shard at a time.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import BATCH_CLASSES
+from .cubie import CUBIE_TABLES
+from .scramble import scramble_moves
+
+MANIFEST = "manifest.json"
+
+# Random walks generated at once per worker; bounds the memory of one step
+CHUNK_TRAJECTORIES = 65536
+
+
+def shard_files(out_dir, index):
+    prefix = os.path.join(out_dir, f"shard_{index:05d}")
+    return {
+        "states": f"{prefix}_states.npy",
+        "depth": f"{prefix}_depth.npy",
+        "last_move": f"{prefix}_last_move.npy",
+    }
+
+
+def generate_shard(out_dir, index, seed, size=3, trajectories=1024, depth=26, representation="grid"):
+    """Write one shard of trajectories * depth samples; returns its manifest entry."""
+    rng = np.random.default_rng(seed)
+    count = trajectories * depth
+    if representation == "grid":
+        state_shape = (3 * size, 3 * size)
+    else:
+        state_shape = (CUBIE_TABLES[size].state_size,)
+
+    files = shard_files(out_dir, index)
+    states = np.lib.format.open_memmap(files["states"], mode="w+", dtype=np.uint8, shape=(count,) + state_shape)
+    depths = np.lib.format.open_memmap(files["depth"], mode="w+", dtype=np.uint8, shape=(count,))
+    last_moves = np.lib.format.open_memmap(files["last_move"], mode="w+", dtype=np.uint8, shape=(count,))
+
+    row = 0
+    for start in range(0, trajectories, CHUNK_TRAJECTORIES):
+        walks = min(CHUNK_TRAJECTORIES, trajectories - start)
+        if representation == "grid":
+            batch = BATCH_CLASSES[size](walks, shuffle_num=0)
+            current = batch.cubes
+        else:
+            tables = CUBIE_TABLES[size]
+            current = np.broadcast_to(tables.solved_state, (walks,) + state_shape).copy()
+        walk_moves = scramble_moves(rng, walks, depth)
+        for step, moves in enumerate(walk_moves.T):
+            if representation == "grid":
+                batch.update(moves)
+            else:
+                current = tables.move(current, moves)
+            states[row:row + walks] = current
+            depths[row:row + walks] = step + 1
+            last_moves[row:row + walks] = moves
+            row += walks
+
+    for array in (states, depths, last_moves):
+        array.flush()
+    return {"index": index, "count": count, "files": {k: os.path.basename(v) for k, v in files.items()}}
+
+
+def generate(out_dir, size=3, samples=1_000_000, shards=16, depth=26, seed=0,
+             representation="grid", workers=None):
+    """Generate a dataset with a process pool and write its manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    trajectories = -(-samples // (shards * depth))
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(generate_shard, out_dir, i, seeds[i], size, trajectories, depth, representation)
+            for i in range(shards)
+        ]
+        entries = [f.result() for f in futures]
+
+    manifest = {
+        "size": size,
+        "representation": representation,
+        "depth": depth,
+        "seed": seed,
+        "count": sum(e["count"] for e in entries),
+        "shards": entries,
+    }
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST)) as f:
+        return json.load(f)
+
+
+def _load_shard(out_dir, entry):
+    return tuple(np.load(os.path.join(out_dir, entry["files"][key]), mmap_mode="r")
+                 for key in ("states", "depth", "last_move"))
+
+
+def iter_shards(out_dir):
+    """Yield (states, depth, last_move) memmaps shard by shard."""
+    for entry in load_manifest(out_dir)["shards"]:
+        yield _load_shard(out_dir, entry)
+
+
+def iter_samples(out_dir, batch_size=4096, shuffle_shards=False, seed=None):
+    """Stream (states, depth, last_move) batches; only one shard is mapped at a time."""
+    entries = load_manifest(out_dir)["shards"]
+    order = np.arange(len(entries))
+    if shuffle_shards:
+        np.random.default_rng(seed).shuffle(order)
+    for i in order:
+        states, depths, last_moves = _load_shard(out_dir, entries[i])
+        for start in range(0, len(depths), batch_size):
+            yield (np.asarray(states[start:start + batch_size]),
+                   np.asarray(depths[start:start + batch_size]),
+                   np.asarray(last_moves[start:start + batch_size]))
+        # Unmap this shard before the next one is opened
+        del states, depths, last_moves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a sharded random-walk dataset")
+    parser.add_argument("out_dir")
+    parser.add_argument("--size", type=int, choices=[2, 3], default=3)
+    parser.add_argument("--samples", type=int, default=1_000_000)
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--depth", type=int, default=26, help="moves per random walk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--representation", choices=["grid", "cubie"], default="grid")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = generate(args.out_dir, args.size, args.samples, args.shards, args.depth,
+                        args.seed, args.representation, args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"wrote {manifest['count']} samples in {len(manifest['shards'])} shards "
+          f"to {args.out_dir} in {elapsed:.1f} s ({manifest['count'] / elapsed:,.0f} samples/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Exact distance-to-solved for every 2x2x2 state.
+
+Build once (a few seconds with numpy):
+    python -m rubik.distance_2x2x2 [--path rubik/tables/distance_2x2x2.bin]
+
+The table stores the optimal number of update() moves (quarter-turn
+metric, i.e. the 12 moves of rubik_2x2x2) for each
+encode_2x2x2() index as packed nibbles (1.8 MB).
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .coord import STATE_COUNT_2x2x2, decode_2x2x2, encode_2x2x2
+from .cube_2x2x2 import MOVE_PERMS
+from .cubie import TABLES_2x2x2
+from .table_store import get_nibbles, load_table, pack_nibbles, save_table, table_path
+
+MAGIC = b"RBK2DIST"
+DEFAULT_PATH = table_path("distance_2x2x2.bin")
+
+# Moves that keep the DBL corner home, so reduced states stay reduced:
+# R, Ri, Ui, U, F, Fi. L/D/B are the same turns up to a whole-cube rotation.
+FIXED_CORNER_MOVES = [0, 1, 4, 5, 8, 9]
+
+_ORI_COUNT = 3 ** 6
+
+
+def coordinate_move_tables():
+    """Move tables on the (7! permutation, 3^6 orientation) parts of encode_2x2x2()."""
+    perms = decode_2x2x2(np.arange(STATE_COUNT_2x2x2 // _ORI_COUNT) * _ORI_COUNT)
+    oris = decode_2x2x2(np.arange(_ORI_COUNT))
+    perm_move = np.empty((len(perms), len(FIXED_CORNER_MOVES)), dtype=np.int64)
+    ori_move = np.empty((len(oris), len(FIXED_CORNER_MOVES)), dtype=np.int64)
+    for i, m in enumerate(FIXED_CORNER_MOVES):
+        perm_move[:, i] = encode_2x2x2(TABLES_2x2x2.move(perms, np.full(len(perms), m))) // _ORI_COUNT
+        ori_move[:, i] = encode_2x2x2(TABLES_2x2x2.move(oris, np.full(len(oris), m))) % _ORI_COUNT
+    return perm_move, ori_move
+
+
+def build_distances():
+    """Breadth-first search over all 3,674,160 states from the solved cube."""
+    perm_move, ori_move = coordinate_move_tables()
+    distances = np.full(STATE_COUNT_2x2x2, 255, dtype=np.uint8)
+    distances[0] = 0
+    frontier = np.array([0], dtype=np.int64)
+    depth = 0
+    while len(frontier):
+        perm, ori = np.divmod(frontier, _ORI_COUNT)
+        neighbours = (perm_move[perm] * _ORI_COUNT + ori_move[ori]).ravel()
+        neighbours = np.unique(neighbours[distances[neighbours] == 255])
+        depth += 1
+        distances[neighbours] = depth
+        frontier = neighbours
+    return distances
+
+
+def build(path=DEFAULT_PATH):
+    distances = build_distances()
+    save_table(path, MAGIC, pack_nibbles(distances), STATE_COUNT_2x2x2)
+    return distances
+
+
+class distance_table_2x2x2:
+    """memory-mapped distance table (読み込み専用・プロセス間で共有)"""
+
+    def __init__(self, path=DEFAULT_PATH, build_missing=True):
+        try:
+            count, self.packed = load_table(path, MAGIC)
+        except FileNotFoundError:
+            if not build_missing:
+                raise
+            build(path)
+            count, self.packed = load_table(path, MAGIC)
+        if count != STATE_COUNT_2x2x2:
+            raise ValueError(f"{path} has {count} entries, expected {STATE_COUNT_2x2x2}")
+
+    def distance(self, indices):
+        """Optimal move count for encode_2x2x2() indices (scalar or array)."""
+        return get_nibbles(self.packed, indices)
+
+    def cube_distance(self, cube):
+        """Optimal move count of one or more (6, 6) grids."""
+        return self.distance(encode_2x2x2(TABLES_2x2x2.from_cube(cube)))
+
+    def best_move(self, cube):
+        """update() index that brings a (6, 6) grid one move closer to solved (None if solved)."""
+        state = TABLES_2x2x2.from_cube(cube)
+        if self.distance(encode_2x2x2(state)) == 0:
+            return None
+        next_states = TABLES_2x2x2.move(np.broadcast_to(state, (len(MOVE_PERMS),) + state.shape),
+                                        np.arange(len(MOVE_PERMS)))
+        return int(np.argmin(self.distance(encode_2x2x2(next_states))))
+
+    def solve(self, cube):
+        """Optimal update() index list for a (6, 6) grid.
+
+        Every face ends up in one colour (is_solved()); the cube may end
+        rotated as a whole compared with rubik_2x2x2's initial grid.
+        """
+        cube = np.array(cube)
+        solution = []
+        while (move := self.best_move(cube)) is not None:
+            cube = cube.ravel()[MOVE_PERMS[move]]
+            solution.append(move)
+        return solution
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the 2x2x2 distance table")
+    parser.add_argument("--path", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    distances = build(args.path)
+    print(f"wrote {args.path} in {time.perf_counter() - start:.1f} s")
+    for depth, count in enumerate(np.bincount(distances)):
+        print(f"  {depth:2d}: {count:9d}")
+
+
+if __name__ == "__main__":
+    main()
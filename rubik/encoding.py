@@ -0,0 +1,145 @@
+"""One-hot encoders for network inputs, written into caller-supplied buffers.
+
+facelet_encoder(n): (N, 3n, 3n) grids -> (N, 6n^2 * 6), sticker f colour c
+    (1..6) at f * 6 + c - 1, stickers in facelet_table() order (the
+    padding cells of the grid are dropped).
+cubie_encoder(n): (N, 3n, 3n) grids or cubie states -> per piece type
+    [permutation one-hot (slot, cubie) | orientation one-hot (slot, twist)]:
+    3x3x3: corners 8*8 + 8*3, edges 12*12 + 12*2 = 256; 2x2x2: 88.
+
+encode(cubes, out) fills out (uint8, float32, ... of shape (N, size) or
+any C-contiguous shape with N * size elements) with one index map:
+every state sets exactly one value per sticker (or cubie slot), so the
+buffer is cleared and the ones are written by position. Work arrays
+are kept by the encoder and only grow, nothing is allocated per call
+(np.take runs with mode="clip": with the default mode it copies out first).
+Both encoders reject grids they cannot encode with ValueError: facelet
+colours outside 1..6, and for cubie_encoder.encode() any grid that is not
+a valid cube state (as cubie_tables.from_cube() does).
+"""
+import numpy as np
+
+from .cubie import CUBIE_TABLES
+from .geometry import facelet_table
+
+
+class _onehot_encoder:
+    def __init__(self, offsets, size):
+        # offsets[v]: position of the one of value 0 of the v-th encoded value in a state's row
+        self.size = size
+        self._offsets = offsets
+        self._positions = np.empty((0, len(offsets)), dtype=np.intp)
+        self._row_offsets = np.empty((0, 1), dtype=np.intp)
+
+    def new_output(self, count, dtype=np.float32):
+        return np.zeros((count, self.size), dtype=dtype)
+
+    def _reserve(self, count):
+        # Work arrays of the subclass for count states, grown once to the largest batch seen
+        if len(self._positions) < count:
+            self._positions = np.empty((count, len(self._offsets)), dtype=np.intp)
+            self._row_offsets = (np.arange(count, dtype=np.intp) * self.size)[:, None]
+            self._grow(count)
+
+    def _grow(self, count):
+        pass
+
+    def _scatter(self, values, out):
+        # values: (count, len(offsets)) uint8 -> ones of out
+        count = len(values)
+        flat = out.reshape(-1)
+        if flat.size != count * self.size or not out.flags.c_contiguous:
+            raise ValueError(f"out must be C-contiguous with {count} x {self.size} elements")
+        positions = self._positions[:count]
+        np.add(values, self._offsets, out=positions)
+        positions += self._row_offsets[:count]
+        flat.fill(0)
+        flat[positions] = 1
+        return out
+
+
+class facelet_encoder(_onehot_encoder):
+    """展開図 (N, 3n, 3n) → ステッカーごとの6色 one-hot (N, 6n^2 * 6)"""
+
+    def __init__(self, n):
+        self.n = n
+        self.facelets = facelet_table(n)[0].astype(np.intp)
+        count = len(self.facelets)
+        # Colours are 1..6
+        super().__init__(np.arange(count, dtype=np.intp) * 6 - 1, count * 6)
+        self._stickers = np.empty((0, count), dtype=np.uint8)
+
+    def _grow(self, count):
+        self._stickers = np.empty((count, len(self.facelets)), dtype=np.uint8)
+
+    def encode(self, cubes, out=None, dtype=np.float32):
+        cubes = np.asarray(cubes)
+        count = len(cubes)
+        if out is None:
+            out = self.new_output(count, dtype)
+        self._reserve(count)
+        stickers = self._stickers[:count]
+        np.take(cubes.reshape(count, -1), self.facelets, axis=1, out=stickers, mode="clip")
+        # Out of range the one would land on a neighbouring sticker (or past the row)
+        if count and (stickers.min() < 1 or stickers.max() > 6):
+            raise ValueError("cube contains a sticker colour outside 1..6")
+        return self._scatter(stickers, out)
+
+
+class cubie_encoder(_onehot_encoder):
+    """展開図またはキュービー表現 → コーナー (・エッジ) の順列と向きの one-hot"""
+
+    def __init__(self, n):
+        self.n = n
+        self.tables = CUBIE_TABLES[n]
+        offsets = []
+        size = 0
+        for _, count, k, *_ in self.tables.pieces:
+            # Permutation: slot j, cubie c at size + j * count + c; orientation: slot j, twist o
+            offsets.append(size + np.arange(count) * count)
+            size += count * count
+            offsets.append(size + np.arange(count) * k)
+            size += count * k
+        super().__init__(np.concatenate(offsets).astype(np.intp), size)
+        self._states = np.empty((0, self.tables.state_size), dtype=np.uint8)
+        self._stickers = []
+        self._codes = []
+
+    def _grow(self, count):
+        self._states = np.empty((count, self.tables.state_size), dtype=np.uint8)
+        self._stickers = [np.empty((count, facelets.shape[0], facelets.shape[1]), dtype=np.uint8)
+                          for _, _, _, facelets, *_ in self.tables.pieces]
+        self._codes = [np.empty((count, facelets.shape[0]), dtype=np.intp)
+                       for _, _, _, facelets, *_ in self.tables.pieces]
+
+    def encode(self, cubes, out=None, dtype=np.float32):
+        """(N, 3n, 3n) grids; same result as encode_states(tables.from_cube(cubes))"""
+        cubes = np.asarray(cubes)
+        count = len(cubes)
+        if out is None:
+            out = self.new_output(count, dtype)
+        self._reserve(count)
+        flat = cubes.reshape(count, -1)
+        states = self._states[:count]
+        for (start, pieces, k, facelets, _, _, lut_p, lut_o), stickers, code in zip(
+                self.tables.pieces, self._stickers, self._codes):
+            # Base-7 code of each slot's stickers, looked up as (cubie, twist) like cubie_tables.from_cube
+            stickers, code = stickers[:count], code[:count]
+            np.take(flat, facelets, axis=1, out=stickers, mode="clip")
+            code[...] = stickers[:, :, 0]
+            for i in range(1, k):
+                code *= 7
+                code += stickers[:, :, i]
+            np.take(lut_p, code, out=states[:, start:start + pieces], mode="clip")
+            np.take(lut_o, code, out=states[:, start + pieces:start + 2 * pieces], mode="clip")
+        if (states == 255).any():
+            raise ValueError("cube contains a sticker combination that is not a valid cubie")
+        return self._scatter(states, out)
+
+    def encode_states(self, states, out=None, dtype=np.float32):
+        """(N, state_size) cubie states (rubik_3x3x3_cubie.state, cubie_tables.from_cube())"""
+        states = np.asarray(states, dtype=np.uint8)
+        if out is None:
+            out = self.new_output(len(states), dtype)
+        self._reserve(len(states))
+        return self._scatter(states, out)
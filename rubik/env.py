@@ -0,0 +1,244 @@
+"""Gym-style vector environments for reinforcement learning.
+
+rubik_vector_env steps N cubes in-process with the batch classes.
+rubik_async_vector_env splits the cubes over worker processes; workers
+read actions from and write observations, rewards and done flags into one
+shared-memory block, so the learner gets them without any copy or pickling.
+
+Both return their internal buffers from reset()/step(): the arrays are
+overwritten by the next call, copy them if they have to be kept.
+"""
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from . import BATCH_CLASSES
+from .encoding import facelet_encoder
+from .geometry import facelet_table
+from .render2d import image_renderer
+from .scramble import scramble_moves
+from .shared_arrays import layout_nbytes, layout_views
+
+ACTION_COUNT = 12
+OBSERVATIONS = ("facelets", "onehot", "image")
+# Pixels per grid cell of the "image" observation
+IMAGE_CELL_SIZE = 4
+
+
+def observation_size(size, observation="facelets", cell_size=IMAGE_CELL_SIZE):
+    """facelets: 各ステッカーの色 (1..6)、onehot: ステッカーごとの6色 one-hot、image: 展開図のRGB画像"""
+    stickers = 6 * size * size
+    if observation == "image":
+        return (3 * size * cell_size) ** 2 * 3
+    return stickers if observation == "facelets" else stickers * 6
+
+
+def _buffer_layout(num_envs, obs_dim):
+    # (name, dtype, shape) of every array kept in the shared block
+    return [
+        ("actions", np.int64, (num_envs,)),
+        ("reward", np.float32, (num_envs,)),
+        ("done", np.bool_, (num_envs,)),
+        ("solved", np.bool_, (num_envs,)),
+        ("truncated", np.bool_, (num_envs,)),
+        ("obs", np.uint8, (num_envs, obs_dim)),
+        ("final_obs", np.uint8, (num_envs, obs_dim)),
+    ]
+
+
+class rubik_vector_env:
+    """N個のキューブをまとめて扱う reset()/step() 環境 (同一プロセス)
+
+    step(actions) takes one update() index per cube and returns
+    (obs, reward, done, info). A cube is done when every face shows one
+    colour (solved) or after max_steps moves (truncated); done cubes are
+    scrambled again right away and info["final_observation"] holds their
+    last observation.
+    """
+
+    def __init__(self, num_envs, size=3, scramble_depth=20, max_steps=50, observation="facelets",
+                 solved_reward=1.0, step_reward=-0.01, seed=None, buffers=None, cell_size=IMAGE_CELL_SIZE):
+        if observation not in OBSERVATIONS:
+            raise ValueError(f"observation must be one of {OBSERVATIONS}")
+        self.num_envs = num_envs
+        self.size = size
+        self.scramble_depth = scramble_depth
+        self.max_steps = max_steps
+        self.observation = observation
+        self.solved_reward = solved_reward
+        self.step_reward = step_reward
+        self.obs_dim = observation_size(size, observation, cell_size)
+        self.rng = np.random.default_rng(seed)
+
+        self.batch = BATCH_CLASSES[size](num_envs, shuffle_num=0)
+        self._flat_perms = self.batch._flat_perms
+        self._facelets = facelet_table(size)[0]
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        if observation == "image":
+            # obs rows are flattened (H, W, 3) RGB images; done cubes are drawn into _images first
+            self._renderer = image_renderer(self.batch.solved_cube.shape, cell_size)
+            self._images = self._renderer.new_output(num_envs)
+        elif observation == "onehot":
+            self._encoder = facelet_encoder(size)
+            self._onehot = self._encoder.new_output(num_envs, np.uint8)
+
+        if buffers is None:
+            layout = _buffer_layout(num_envs, self.obs_dim)
+            buffers = layout_views(bytearray(layout_nbytes(layout)), layout)
+        self.buffers = buffers
+
+    def _scramble(self, indices):
+        solved = self.batch.solved_cube
+        cubes = np.broadcast_to(solved.ravel(), (len(indices), solved.size))
+        for moves in scramble_moves(self.rng, len(indices), self.scramble_depth).T:
+            cubes = np.take_along_axis(cubes, self._flat_perms[moves], axis=1)
+        # Through the batch so that its state hashes (transition_cache keys) follow
+        self.batch.set_cubes(indices, cubes.reshape((len(indices),) + solved.shape))
+        self.steps[indices] = 0
+
+    def _observe(self, indices=slice(None)):
+        stickers = self.batch.cubes.reshape(self.num_envs, -1)[indices][:, self._facelets]
+        obs = self.buffers["obs"]
+        if self.observation == "facelets":
+            obs[indices] = stickers
+        elif self.observation == "image":
+            if isinstance(indices, slice):
+                self._renderer.render(self.batch.cubes, out=obs.reshape(self._images.shape))
+            else:
+                images = self._renderer.render(self.batch.cubes[indices], out=self._images[:len(stickers)])
+                obs[indices] = images.reshape(len(stickers), -1)
+        elif isinstance(indices, slice):
+            # onehot: the encoder writes straight into the obs buffer
+            self._encoder.encode(self.batch.cubes, out=obs)
+        else:
+            obs[indices] = self._encoder.encode(self.batch.cubes[indices], out=self._onehot[:len(stickers)])
+        return stickers
+
+    def reset(self):
+        self._scramble(np.arange(self.num_envs))
+        self._observe()
+        return self.buffers["obs"]
+
+    def step(self, actions):
+        b = self.buffers
+        self.batch.update(np.asarray(actions, dtype=np.intp))
+        self.steps += 1
+
+        stickers = self._observe()
+        faces = stickers.reshape(self.num_envs, 6, -1)
+        np.all(faces == faces[:, :, :1], axis=(1, 2), out=b["solved"])
+        np.logical_and(self.steps >= self.max_steps, ~b["solved"], out=b["truncated"])
+        np.logical_or(b["solved"], b["truncated"], out=b["done"])
+        b["reward"][...] = np.where(b["solved"], self.solved_reward, self.step_reward)
+
+        done = np.flatnonzero(b["done"])
+        if len(done):
+            b["final_obs"][done] = b["obs"][done]
+            self._scramble(done)
+            self._observe(done)
+        info = {"solved": b["solved"], "truncated": b["truncated"], "final_observation": b["final_obs"]}
+        return b["obs"], b["reward"], b["done"], info
+
+
+def _worker(pipe, shm_name, num_envs, obs_dim, start, stop, seed, env_kwargs):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    views = layout_views(shm.buf, _buffer_layout(num_envs, obs_dim))
+    env = rubik_vector_env(stop - start, seed=seed,
+                           buffers={k: v[start:stop] for k, v in views.items()}, **env_kwargs)
+    actions = views["actions"][start:stop]
+    while True:
+        command = pipe.recv()
+        if command == "step":
+            env.step(actions)
+        elif command == "reset":
+            env.reset()
+        elif command == "close":
+            break
+        pipe.send(None)
+    # The numpy views must go before the block can be closed
+    del views, env, actions
+    shm.close()
+
+
+class rubik_async_vector_env:
+    """rubik_vector_env をワーカープロセスに分割して並列に進める
+
+    step_async(actions) copies the actions into shared memory and returns at
+    once; step_wait() blocks until every worker has written its slice.
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=None, **env_kwargs):
+        size = env_kwargs.get("size", 3)
+        observation = env_kwargs.get("observation", "facelets")
+        self.num_envs = num_envs
+        self.obs_dim = observation_size(size, observation, env_kwargs.get("cell_size", IMAGE_CELL_SIZE))
+        num_workers = min(num_workers or mp.cpu_count(), num_envs)
+
+        layout = _buffer_layout(num_envs, self.obs_dim)
+        self._shm = shared_memory.SharedMemory(create=True, size=layout_nbytes(layout))
+        self.buffers = layout_views(self._shm.buf, layout)
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        seeds = np.random.SeedSequence(seed).spawn(num_workers)
+
+        self._pipes, self._procs = [], []
+        for i in range(num_workers):
+            parent, child = mp.Pipe()
+            proc = mp.Process(target=_worker, daemon=True, args=(
+                child, self._shm.name, num_envs, self.obs_dim, bounds[i], bounds[i + 1], seeds[i], env_kwargs))
+            proc.start()
+            child.close()
+            self._pipes.append(parent)
+            self._procs.append(proc)
+        self.closed = False
+
+    def _broadcast(self, command):
+        for pipe in self._pipes:
+            pipe.send(command)
+
+    def _wait(self):
+        for pipe in self._pipes:
+            pipe.recv()
+
+    def reset(self):
+        self._broadcast("reset")
+        self._wait()
+        return self.buffers["obs"]
+
+    def step_async(self, actions):
+        self.buffers["actions"][...] = actions
+        self._broadcast("step")
+
+    def step_wait(self):
+        self._wait()
+        b = self.buffers
+        info = {"solved": b["solved"], "truncated": b["truncated"], "final_observation": b["final_obs"]}
+        return b["obs"], b["reward"], b["done"], info
+
+    def step(self, actions):
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        if self.closed:
+            return
+        self._broadcast("close")
+        for proc in self._procs:
+            proc.join()
+        self.buffers = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass  # arrays returned by step() are still referenced by the caller
+        self._shm.unlink()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
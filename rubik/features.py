@@ -0,0 +1,74 @@
+"""Solved-ness and heuristic features of grid states.
+
+feature_tables(n) records where every sticker and every cubie of an nxnxn
+cube sits in the (3n, 3n) grid, so the features of a whole batch come out
+of a few vectorized gathers over the grid. They are computed on demand
+from the current grids (nothing is cached or updated per move):
+* correct facelets per face (U, L, F, R, D, B),
+* solved corners and edges (every sticker of the cubie in place;
+  the edges of a cube larger than 3x3x3 are its edge wings),
+* solved (solved()): every face shows one colour.
+
+The counts are relative to the solved grid, so a 2x2x2 turned as a whole
+has few correct facelets; solved() is not (a 2x2x2 has no centres that
+fix its orientation, so any whole-cube rotation of the solved grid is
+solved, as in rubik/env.py).
+"""
+import functools
+
+import numpy as np
+
+from .geometry import facelet_table, solved_grid
+
+# Piece kinds by sticker count
+CORNER, EDGE, CENTRE = 0, 1, 2
+
+
+class feature_tables:
+    """展開図のマスとステッカー・キュービーの対応表"""
+
+    def __init__(self, n):
+        flat, _, positions = facelet_table(n)
+        solved = solved_grid(n).ravel()
+        self.n = n
+        self.sticker_count = len(flat)
+        # Stickers face by face (facelet_table order), so per-face sums are a reshape
+        self.grid_index = flat.astype(np.intp)
+        self.solved_colors = solved[flat]
+
+        # Cubies: grid cells of their stickers, corners first, then edges, then centres.
+        # Shorter cubies are padded with cell 0, a padding cell that always matches.
+        piece_of = {}
+        for cell, p in zip(flat.tolist(), map(tuple, positions.tolist())):
+            piece_of.setdefault(p, []).append(cell)
+        groups = sorted(piece_of.values(), key=lambda cells: -len(cells))
+        self.piece_cells = np.zeros((3, len(groups)), dtype=np.intp)
+        for piece, cells in enumerate(groups):
+            self.piece_cells[:len(cells), piece] = cells
+        self.piece_colors = solved[self.piece_cells]
+        sizes = [sum(len(cells) == k for cells in groups) for k in (3, 2, 1)]
+        self.kind_bounds = np.cumsum([0] + sizes).tolist()
+
+        for table in (self.grid_index, self.solved_colors, self.piece_cells, self.piece_colors):
+            table.setflags(write=False)
+
+    def compute(self, cubes):
+        """(correct facelets (N, 6), solved cubies per kind (N, 3)) of (N, 3n, 3n) grids"""
+        flat = cubes.reshape(len(cubes), -1)
+        correct = flat[:, self.grid_index] == self.solved_colors
+        faces = correct.reshape(len(cubes), 6, -1).sum(axis=2)
+        pieces = flat[:, self.piece_cells] == self.piece_colors
+        solved = pieces[:, 0] & pieces[:, 1] & pieces[:, 2]
+        bounds = self.kind_bounds
+        kinds = np.stack([solved[:, bounds[k]:bounds[k + 1]].sum(axis=1) for k in (CORNER, EDGE, CENTRE)], axis=1)
+        return faces, kinds
+
+    def solved(self, cubes):
+        """(N,) bool: every face of (N, 3n, 3n) grids shows one colour"""
+        stickers = cubes.reshape(len(cubes), -1)[:, self.grid_index].reshape(len(cubes), 6, -1)
+        return (stickers == stickers[:, :, :1]).all(axis=(1, 2))
+
+
+@functools.lru_cache(maxsize=None)
+def tables_for(n):
+    return feature_tables(n)
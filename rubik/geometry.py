@@ -0,0 +1,62 @@
+import numpy as np
+
+# Face order and colour codes of the flattened grid
+# 1:White(U), 2:Orange(L), 3:Green(F), 4:Red(R), 5:Yellow(D), 6:Blue(B)
+FACE_NAMES = ["U", "L", "F", "R", "D", "B"]
+
+# Outward normals in RubikCubeCamera's world space (x: right, y: up, z: back)
+FACE_NORMALS = np.array([
+    (0, 1, 0),   # U
+    (-1, 0, 0),  # L
+    (0, 0, -1),  # F
+    (1, 0, 0),   # R
+    (0, -1, 0),  # D
+    (0, 0, 1),   # B
+], dtype=np.int64)
+
+
+def face_slices(n):
+    """各面の (row start, row end, col start, col end) を返す (n = 1辺のキューブ数)"""
+    return [
+        (0, n, n, 2 * n),              # U
+        (n, 2 * n, 0, n),              # L
+        (n, 2 * n, n, 2 * n),          # F
+        (n, 2 * n, 2 * n, 3 * n),      # R
+        (2 * n, 3 * n, n, 2 * n),      # D
+        (2 * n, 3 * n, 2 * n, 3 * n),  # B
+    ]
+
+
+def facelet_position(face, r, c, n):
+    """面faceの(r, c)にあるステッカーが乗っているキューブの中心座標"""
+    h = (n - 1) / 2
+    return [
+        (c - h, h, h - r),   # U
+        (-h, h - r, h - c),  # L
+        (c - h, h - r, -h),  # F
+        (h, h - r, c - h),   # R
+        (c - h, -h, r - h),  # D
+        (c - h, h - r, h),   # B
+    ][face]
+
+
+def facelet_table(n):
+    """Every sticker of the (3n, 3n) grid as (flat grid index, face, doubled cubie position).
+
+    Positions are doubled so that they are integers for even n as well.
+    """
+    flat, faces, positions = [], [], []
+    for face, (rs, _, cs, _) in enumerate(face_slices(n)):
+        for r in range(n):
+            for c in range(n):
+                flat.append((rs + r) * 3 * n + cs + c)
+                faces.append(face)
+                positions.append([round(2 * v) for v in facelet_position(face, r, c, n)])
+    return np.array(flat), np.array(faces), np.array(positions, dtype=np.int64)
+
+
+def solved_grid(n):
+    grid = np.zeros((3 * n, 3 * n), dtype=np.uint8)
+    for face, (rs, re, cs, ce) in enumerate(face_slices(n)):
+        grid[rs:re, cs:ce] = face + 1
+    return grid
@@ -0,0 +1,38 @@
+import re
+
+# Move names in update() order: R, Ri, Li, L, Ui, U, D, Di, F, Fi, Bi, B
+MOVE_NAMES = ["R", "R'", "L'", "L", "U'", "U", "D", "D'", "F", "F'", "B'", "B"]
+
+_FACE_MOVES = {name[0]: (MOVE_NAMES.index(name[0]), MOVE_NAMES.index(name[0] + "'")) for name in MOVE_NAMES}
+_TOKEN = re.compile(r"\s*([RLUDFB])(i2|'2|2'|2|i|')?\s*")
+
+
+def parse_moves(moves, move_count=len(MOVE_NAMES)):
+    """手順の文字列 (R U R' U' 形式、i / ' / 2 に対応) またはupdate()のインデックス列を int のタプルにする
+
+    Indices must lie in 0..move_count - 1 (the moves of the cube they are for).
+    """
+    if not isinstance(moves, str):
+        indices = tuple(int(m) for m in moves)
+        invalid = [m for m in indices if not 0 <= m < move_count]
+        if invalid:
+            raise ValueError(f"move indices must be in 0..{move_count - 1}, got {invalid}")
+        return indices
+    indices = []
+    pos = 0
+    while pos < len(moves):
+        match = _TOKEN.match(moves, pos)
+        if match is None:
+            if not moves[pos:].strip():
+                break
+            raise ValueError(f"cannot parse move sequence at {moves[pos:]!r}")
+        clockwise, counter = _FACE_MOVES[match.group(1)]
+        suffix = match.group(2) or ""
+        move = counter if "i" in suffix or "'" in suffix else clockwise
+        indices.extend([move] * (2 if "2" in suffix else 1))
+        pos = match.end()
+    return tuple(indices)
+
+
+def format_moves(rotate_indices):
+    return " ".join(MOVE_NAMES[m] for m in rotate_indices)
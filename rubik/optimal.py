@@ -0,0 +1,272 @@
+"""Optimal (quarter-turn) solvers for rubik_3x3x3 and rubik_2x2x2 by IDA*.
+
+The solution is a shortest list of update() indices. Iterative deepening
+A* explores the moves depth-first under a bound that grows until a
+solution fits; a branch is cut when the heuristic says the cube needs
+more moves than are left. Both heuristics are admissible:
+* 3x3x3: the maximum of the corner and the two edge pattern databases
+  (rubik/pattern_db.py, built on first use),
+* 2x2x2: the exact distance table (rubik/distance_2x2x2.py), searched on
+  the state rotated so that the DBL corner is home.
+
+Redundant sequences are never generated: no move after its inverse, at
+most two equal turns of a face in a row (as clockwise turns, U U rather
+than U' U'), and turns of opposite faces, which commute, only in one
+order (U D, not D U). Every quarter turn is an odd corner permutation,
+so the solution length has the parity of the corner permutation and the
+bound grows by two.
+
+A node only updates Python ints through memory-mapped move tables (no
+arrays or lists are created while searching). solve() records the nodes
+expanded, the time taken and nodes per second (stats()).
+
+These are exact solvers: a 3x3x3 scramble of 16 quarter turns takes
+seconds, every two more moves about 20 times longer (6-edge tables); use
+rubik.two_phase for random states.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from .coord import ROTATION_TO_HOME, ROTATIONS_2x2x2, encode_2x2x2, perm_parity
+from .cubie import TABLES_2x2x2, TABLES_3x3x3
+from .distance_2x2x2 import DEFAULT_PATH, FIXED_CORNER_MOVES, coordinate_move_tables, distance_table_2x2x2
+from .pattern_db import MOVE_COUNT, pattern_database
+from .table_store import TABLE_DIR
+from .two_phase import FACE_TURNS
+
+MAX_LENGTH = 26  # the quarter-turn diameter of the 3x3x3
+
+# Face (R L U D F B) of every update() index; opposite faces share face >> 1
+MOVE_FACE = [0] * MOVE_COUNT
+for _face, _turns in enumerate(FACE_TURNS):
+    for _m in _turns:
+        MOVE_FACE[_m] = _face
+CLOCKWISE = {cw for cw, _ in FACE_TURNS}
+
+
+def successor_table(moves):
+    """(column, move, next state) tuples per search state.
+
+    State 0 is the start; state 1 + 2 * i + d follows moves[i], d = 1 if
+    it was the second equal turn in a row.
+    """
+    table = [[] for _ in range(1 + 2 * len(moves))]
+    for state in range(len(table)):
+        last, doubled = divmod(state - 1, 2)
+        for i, m in enumerate(moves):
+            if state == 0:
+                table[state].append((i, m, 1 + 2 * i))
+                continue
+            face, last_face = MOVE_FACE[m], MOVE_FACE[moves[last]]
+            if face == last_face:
+                if i == last and not doubled and m in CLOCKWISE:
+                    table[state].append((i, m, 2 + 2 * i))
+            elif not (face >> 1 == last_face >> 1 and face < last_face):
+                table[state].append((i, m, 1 + 2 * i))
+    return [tuple(successors) for successors in table]
+
+
+class _ida_solver:
+    def __init__(self):
+        self.nodes = 0
+        self.seconds = 0.0
+        self._path = [0] * MAX_LENGTH
+
+    @property
+    def nodes_per_second(self):
+        return self.nodes / self.seconds if self.seconds else 0.0
+
+    def stats(self):
+        return {"nodes": self.nodes, "seconds": self.seconds, "nodes_per_second": self.nodes_per_second}
+
+    def _deepen(self, start, parity, max_length, search):
+        """Bounds start, start + 2, ... (same parity as the solution) up to max_length"""
+        self.nodes = 0
+        if len(self._path) < max_length:
+            self._path = [0] * max_length
+        begin = time.perf_counter()
+        if (start - parity) % 2:
+            start += 1
+        solution = None
+        for bound in range(start, max_length + 1, 2):
+            if search(bound):
+                solution = self._path[:bound]
+                break
+        self.seconds = time.perf_counter() - begin
+        return solution
+
+
+class optimal_solver_3x3x3(_ida_solver):
+    """rubik_3x3x3 の最短手順 (quarter turn) を IDA* で求める
+
+    edges: the two edge pattern databases, ("edges6a", "edges6b") or
+    ("edges7a", "edges7b") (stronger, 490 MB); each pair covers all 12 edges.
+    """
+
+    def __init__(self, table_dir=TABLE_DIR, build_missing=True, edges=("edges6a", "edges6b")):
+        super().__init__()
+        corners = pattern_database("corners", table_dir, build_missing)
+        self.databases = [corners] + [pattern_database(name, table_dir, build_missing) for name in edges]
+        self._corner_prune = memoryview(corners.packed)
+        self._corner_hi = memoryview(corners.hi_move.reshape(-1))
+        self._corner_lo = memoryview(corners.lo_move.reshape(-1))
+        self._corner_lo_size = corners.pattern.lo_size
+        # Edge coordinates are slots << bits | flips
+        self._edge_bits = self.databases[1].pattern.lo_size.bit_length() - 1
+        self._edge_tables = [(memoryview(db.packed), memoryview(db.hi_move.reshape(-1)),
+                              memoryview(db.flip_mask.reshape(-1))) for db in self.databases[1:]]
+        self._successors = successor_table(range(MOVE_COUNT))
+
+    def heuristic(self, state):
+        """Lower bound on the moves that solve a cubie state"""
+        return max(int(db.state_distance(state)) for db in self.databases)
+
+    def solve(self, cube, max_length=MAX_LENGTH):
+        """Solve a (9, 9) grid; returns a shortest list of update() indices (None if longer than max_length)."""
+        return self.solve_state(TABLES_3x3x3.from_cube(cube), max_length)
+
+    def solve_state(self, state, max_length=MAX_LENGTH):
+        state = np.asarray(state)
+        coords = [int(db.pattern.coord(state)) for db in self.databases]
+        parity = int(perm_parity(state[0:8]))
+        return self._deepen(self.heuristic(state), parity, max_length,
+                            lambda bound: self._search(*coords, bound, 0, 0))
+
+    def _search(self, corner, edge_a, edge_b, togo, state, depth):
+        # Children are only entered when every table allows them, so togo == 0 means solved
+        if togo == 0:
+            return True
+        self.nodes += 1
+        corner_prune, corner_hi, corner_lo = self._corner_prune, self._corner_hi, self._corner_lo
+        (prune_a, hi_a, flip_a), (prune_b, hi_b, flip_b) = self._edge_tables
+        bits, lo_size = self._edge_bits, self._corner_lo_size
+        mask = (1 << bits) - 1
+        corner_perm, corner_ori = divmod(corner, lo_size)
+        corner_perm *= MOVE_COUNT
+        corner_ori *= MOVE_COUNT
+        slots_a, flips_a = (edge_a >> bits) * MOVE_COUNT, edge_a & mask
+        slots_b, flips_b = (edge_b >> bits) * MOVE_COUNT, edge_b & mask
+        togo -= 1
+        for _, m, next_state in self._successors[state]:
+            c = corner_hi[corner_perm + m] * lo_size + corner_lo[corner_ori + m]
+            if (corner_prune[c >> 1] >> ((c & 1) << 2)) & 15 > togo:
+                continue
+            a = hi_a[slots_a + m] << bits | (flips_a ^ flip_a[slots_a + m])
+            if (prune_a[a >> 1] >> ((a & 1) << 2)) & 15 > togo:
+                continue
+            b = hi_b[slots_b + m] << bits | (flips_b ^ flip_b[slots_b + m])
+            if (prune_b[b >> 1] >> ((b & 1) << 2)) & 15 > togo:
+                continue
+            self._path[depth] = m
+            if self._search(c, a, b, togo, next_state, depth + 1):
+                return True
+        return False
+
+
+class optimal_solver_2x2x2(_ida_solver):
+    """rubik_2x2x2 の最短手順 (quarter turn) を IDA* で求める
+
+    The search runs on encode_2x2x2() with the moves that keep the DBL
+    corner home (R, U, F); the moves are then renamed to the faces they
+    are on the unrotated cube. Every face ends up in one colour
+    (is_solved()), the cube may end rotated as a whole (as with
+    distance_table_2x2x2.solve()).
+    """
+
+    def __init__(self, path=DEFAULT_PATH, build_missing=True):
+        super().__init__()
+        table = distance_table_2x2x2(path, build_missing)
+        self._prune = memoryview(table.packed)
+        perm_move, ori_move = coordinate_move_tables()
+        self._ori_count = len(ori_move)
+        self._perm_move = memoryview(perm_move.reshape(-1))
+        self._ori_move = memoryview(ori_move.reshape(-1))
+        self._move_count = len(FIXED_CORNER_MOVES)
+        self._successors = successor_table(FIXED_CORNER_MOVES)
+
+    def solve(self, cube, max_length=MAX_LENGTH):
+        """Solve a (6, 6) grid; returns a shortest list of update() indices."""
+        return self.solve_state(TABLES_2x2x2.from_cube(cube), max_length)
+
+    def solve_state(self, state, max_length=MAX_LENGTH):
+        state = np.asarray(state)
+        index = int(encode_2x2x2(state))
+        start = (self._prune[index >> 1] >> ((index & 1) << 2)) & 15
+        columns = self._deepen(start, int(perm_parity(state[0:8])), max_length,
+                               lambda bound: self._search(index, bound, 0, 0))
+        if columns is None:
+            return None
+        renamed = _unrotated_moves(state)
+        return [renamed[i] for i in columns]
+
+    def _search(self, index, togo, state, depth):
+        if togo == 0:
+            return True
+        self.nodes += 1
+        prune, perm_move, ori_move, count = self._prune, self._perm_move, self._ori_move, self._move_count
+        perm, ori = divmod(index, self._ori_count)
+        perm *= count
+        ori *= count
+        togo -= 1
+        for i, _, next_state in self._successors[state]:
+            child = perm_move[perm + i] * self._ori_count + ori_move[ori + i]
+            if (prune[child >> 1] >> ((child & 1) << 2)) & 15 > togo:
+                continue
+            # The path keeps the search column; solve_state() renames it to an update() index
+            self._path[depth] = i
+            if self._search(child, togo, next_state, depth + 1):
+                return True
+        return False
+
+
+def _rotate_2x2x2(states, rotation):
+    # Same relabelling as coord.reduce_2x2x2() with a fixed rotation
+    slots = rotation[0:8].astype(np.intp)
+    rotated = np.empty_like(states)
+    rotated[..., 0:8] = states[..., slots]
+    rotated[..., 8:16] = (states[..., 8:16][..., slots] + rotation[8:16]) % 3
+    return rotated
+
+
+def _unrotated_moves(state):
+    """update() index on the given cube for each FIXED_CORNER_MOVES turn of its reduced state"""
+    slot = int(np.argmax(state[0:8] == 6))
+    rotation = ROTATIONS_2x2x2[ROTATION_TO_HOME[slot, state[8 + slot]]]
+    turned = _rotate_2x2x2(TABLES_2x2x2.move(np.broadcast_to(state, (MOVE_COUNT, 16)), np.arange(MOVE_COUNT)), rotation)
+    reduced = _rotate_2x2x2(state, rotation)
+    renamed = []
+    for m in FIXED_CORNER_MOVES:
+        target = TABLES_2x2x2.move(reduced, m)
+        renamed.append(int(np.flatnonzero((turned == target).all(axis=1))[0]))
+    return renamed
+
+
+def solver_for(size, **kwargs):
+    return optimal_solver_3x3x3(**kwargs) if size == 3 else optimal_solver_2x2x2(**kwargs)
+
+
+def main():
+    from .scramble import scramble_moves
+
+    parser = argparse.ArgumentParser(description="Solve random scrambles optimally and report the search effort")
+    parser.add_argument("--size", type=int, choices=(2, 3), default=3)
+    parser.add_argument("--depth", type=int, default=10, help="scramble length in quarter turns")
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tables = TABLES_3x3x3 if args.size == 3 else TABLES_2x2x2
+    solver = solver_for(args.size)
+    for i, moves in enumerate(scramble_moves(args.seed, args.count, args.depth, args.size)):
+        state = tables.solved_state
+        for m in moves:
+            state = tables.move(state, m)
+        solution = solver.solve_state(state)
+        print(f"{i}: {len(solution)} moves, {solver.nodes} nodes in {solver.seconds:.2f} s "
+              f"({solver.nodes_per_second:,.0f} nodes/s)")
+
+
+if __name__ == "__main__":
+    main()
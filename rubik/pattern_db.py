@@ -0,0 +1,336 @@
+"""Disk-backed pattern databases of the 3x3x3.
+
+Every table stores, for one coordinate of a subset of the cubies, the
+exact number of update() moves (quarter-turn metric, the 12 moves of
+rubik_3x3x3) needed to solve that subset. A lower bound for the whole
+cube is the maximum over the tables. For the 2x2x2 the corner table is
+only an upper bound: it asks for the corners in their home slots, while a
+2x2x2 turned as a whole is solved too (distance_2x2x2 has its distances).
+
+    corners   all 8 corners, corner_coord(): 88,179,840 entries (42 MB)
+    edges6a   edges UR UF UL UB DR DF:       42,577,920 entries (20 MB)
+    edges6b   edges DL DB FR FL BL BR:       42,577,920 entries (20 MB)
+    edges7a   edges UR .. DL:               510,935,040 entries (244 MB)
+    edges7b   edges DF .. BR:               510,935,040 entries (244 MB)
+
+Build (breadth-first over the coordinate, one pool worker per core):
+    python -m rubik.pattern_db [--dir rubik/tables] [--workers N] [--tables corners edges6a ...]
+
+The distances of a level are written into one uint8 array in shared
+memory; each worker expands a range of it. A level is expanded forwards
+(entries at depth d mark their unvisited neighbours) while the frontier
+is small and backwards (unvisited entries look for a neighbour at depth
+d) once fewer entries are left than the frontier holds. Several workers
+may mark the same entry, always with the same value.
+
+Tables are saved as packed nibbles with a CRC-32 (rubik/table_store.py)
+together with their move tables and opened with np.memmap, so every
+solver process shares one copy through the page cache.
+"""
+import argparse
+import multiprocessing as mp
+import os
+import time
+from math import factorial, prod
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .coord import corner_coord, ori_index, ori_unindex, perm_rank, perm_unrank
+from .cubie import TABLES_3x3x3
+from .shared_arrays import layout_nbytes, layout_views
+from .table_store import TABLE_DIR, get_nibbles, load_table, pack_nibbles, save_table
+
+MAGIC = b"RBKPATDB"
+MOVE_COUNT = 12
+UNVISITED = 255
+
+# Tracked edge cubies of the edge tables (cubie ids = solved slots, see cubie.EDGE_SLOTS)
+EDGE_SUBSETS = {
+    "edges6a": (0, 1, 2, 3, 4, 5),
+    "edges6b": (6, 7, 8, 9, 10, 11),
+    "edges7a": (0, 1, 2, 3, 4, 5, 6),
+    "edges7b": (5, 6, 7, 8, 9, 10, 11),
+}
+PATTERN_NAMES = ["corners"] + list(EDGE_SUBSETS)
+DEFAULT_PATTERNS = ["corners", "edges6a", "edges6b"]
+
+# Entries per worker task
+CHUNK = 1 << 22
+
+
+def _partial_rank(positions, n=12):
+    """Rank of k distinct slots out of n (ordered), radices n, n-1, ..., n-k+1."""
+    positions = np.asarray(positions, dtype=np.int64)
+    rank = np.zeros(positions.shape[:-1], dtype=np.int64)
+    for i in range(positions.shape[-1]):
+        digit = positions[..., i] - (positions[..., :i] < positions[..., i:i + 1]).sum(axis=-1)
+        rank = rank * (n - i) + digit
+    return rank
+
+
+def _partial_unrank(ranks, k, n=12):
+    ranks = np.array(ranks, dtype=np.int64)
+    positions = np.empty(ranks.shape + (k,), dtype=np.uint8)
+    available = np.ones(ranks.shape + (n,), dtype=bool)
+    for i in range(k):
+        base = prod(range(n - k + 1, n - i))
+        digit = ranks // base
+        ranks %= base
+        pick = np.argmax(available & (np.cumsum(available, axis=-1) == digit[..., None] + 1), axis=-1)
+        positions[..., i] = pick
+        np.put_along_axis(available, pick[..., None], False, axis=-1)
+    return positions
+
+
+def _flip_bits(flips):
+    bits = np.zeros(flips.shape[:-1], dtype=np.int64)
+    for i in range(flips.shape[-1]):
+        bits = bits << 1 | flips[..., i]
+    return bits
+
+
+class pattern:
+    """パターンDBの座標: index = hi * lo_size + lo
+
+    Corners: hi = corner permutation rank, lo = twist; a move maps them
+    independently (hi_move, lo_move). Edges: hi = slots of the tracked
+    edges, lo = their flips (one bit each); a move flips the bits given by
+    flip_mask[hi, m], which depends on where the edges are.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        if name == "corners":
+            self.edges = None
+            self.hi_size, self.lo_size = factorial(8), 3 ** 7
+        else:
+            self.edges = np.array(EDGE_SUBSETS[name], dtype=np.intp)
+            k = len(self.edges)
+            self.hi_size, self.lo_size = factorial(12) // factorial(12 - k), 2 ** k
+        self.size = self.hi_size * self.lo_size
+        self.solved = int(self.coord(TABLES_3x3x3.solved_state))
+
+    @property
+    def table_names(self):
+        return ["distance", "hi_move", "lo_move" if self.edges is None else "flip_mask"]
+
+    def coord(self, states):
+        """Coordinate of 3x3x3 cubie states (int64, any batch shape)"""
+        states = np.asarray(states)
+        if self.edges is None:
+            return corner_coord(states)
+        # argsort of ep: slot of every cubie
+        slots = np.argsort(states[..., 16:28], axis=-1)[..., self.edges]
+        flips = np.take_along_axis(states[..., 28:40], slots, axis=-1).astype(np.int64)
+        return _partial_rank(slots) * self.lo_size + _flip_bits(flips)
+
+    def build_move_tables(self, block=1 << 20):
+        """{"hi_move", "lo_move" or "flip_mask"}: (size, MOVE_COUNT) tables"""
+        moves = np.arange(MOVE_COUNT)
+        solved = TABLES_3x3x3.solved_state
+        if self.edges is None:
+            perms = np.broadcast_to(solved, (self.hi_size, 40)).copy()
+            perms[:, 0:8] = perm_unrank(np.arange(self.hi_size), 8)
+            twists = np.broadcast_to(solved, (self.lo_size, 40)).copy()
+            twists[:, 8:16] = ori_unindex(np.arange(self.lo_size), 8, 3)
+            hi_move = np.empty((self.hi_size, MOVE_COUNT), dtype=np.uint16)
+            lo_move = np.empty((self.lo_size, MOVE_COUNT), dtype=np.uint16)
+            for m in moves:
+                hi_move[:, m] = perm_rank(TABLES_3x3x3.move(perms, np.full(len(perms), m))[:, 0:8])
+                lo_move[:, m] = ori_index(TABLES_3x3x3.move(twists, np.full(len(twists), m))[:, 8:16], 3)
+            return {"hi_move": hi_move, "lo_move": lo_move}
+
+        hi_move = np.empty((self.hi_size, MOVE_COUNT), dtype=np.uint32)
+        flip_mask = np.empty((self.hi_size, MOVE_COUNT), dtype=np.uint8)
+        others = np.setdiff1d(np.arange(12), self.edges).astype(np.uint8)
+        for start in range(0, self.hi_size, block):
+            ranks = np.arange(start, min(start + block, self.hi_size))
+            # Tracked edges in their slots, the other edges in the free slots in order, no flips
+            states = np.broadcast_to(solved, (len(ranks), 40)).copy()
+            ep = np.full((len(ranks), 12), UNVISITED, dtype=np.uint8)
+            np.put_along_axis(ep, _partial_unrank(ranks, len(self.edges)).astype(np.intp),
+                              self.edges.astype(np.uint8), axis=-1)
+            ep[ep == UNVISITED] = np.tile(others, len(ranks))
+            states[:, 16:28] = ep
+            for m in moves:
+                coords = self.coord(TABLES_3x3x3.move(states, np.full(len(states), m)))
+                hi_move[start:start + len(ranks), m] = coords // self.lo_size
+                flip_mask[start:start + len(ranks), m] = coords % self.lo_size
+        return {"hi_move": hi_move, "flip_mask": flip_mask}
+
+    def neighbours(self, tables, indices, m):
+        """Coordinates after update() index m (tables: build_move_tables())"""
+        hi, lo = np.divmod(indices, self.lo_size)
+        moved = tables["hi_move"][hi, m].astype(np.int64) * self.lo_size
+        if self.edges is None:
+            return moved + tables["lo_move"][lo, m]
+        return moved + (lo ^ tables["flip_mask"][hi, m])
+
+
+# --- Breadth-first search over shared memory ---
+def _shared_layout(p, tables):
+    # (name, dtype, shape) of every array kept in the shared block
+    return [("distance", np.uint8, (p.size,))] + [(name, table.dtype, table.shape) for name, table in tables.items()]
+
+
+# Per worker process: (pattern, shared memory, views), set by _attach()
+_search = None
+
+
+def _attach(name, shm_name, layout):
+    global _search
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _search = (pattern(name), shm, layout_views(shm.buf, layout))
+
+
+def _expand(task):
+    """One range of one level; returns the number of entries set to depth + 1 (backward only)"""
+    backward, depth, lo, hi = task
+    p, _, views = _search
+    distance = views["distance"]
+    if not backward:
+        # Entries at depth mark their unvisited neighbours
+        frontier = lo + np.flatnonzero(distance[lo:hi] == depth)
+        for m in range(MOVE_COUNT):
+            found = p.neighbours(views, frontier, m)
+            distance[found[distance[found] == UNVISITED]] = depth + 1
+        return 0
+    # Unvisited entries with a neighbour at depth (the move set is closed under inverses)
+    pending = lo + np.flatnonzero(distance[lo:hi] == UNVISITED)
+    reached = np.zeros(len(pending), dtype=bool)
+    for m in range(MOVE_COUNT):
+        reached |= distance[p.neighbours(views, pending, m)] == depth
+    distance[pending[reached]] = depth + 1
+    return int(reached.sum())
+
+
+def _count(distance, value):
+    return sum(int(np.count_nonzero(distance[lo:lo + CHUNK] == value)) for lo in range(0, len(distance), CHUNK))
+
+
+def build_distances(p, tables, workers=None, log=None):
+    """uint8 distance of every coordinate of pattern p, computed by workers processes"""
+    global _search
+    workers = workers or os.cpu_count()
+    layout = _shared_layout(p, tables)
+    shm = shared_memory.SharedMemory(create=True, size=layout_nbytes(layout))
+    pool = None
+    try:
+        views = layout_views(shm.buf, layout)
+        for name, table in tables.items():
+            views[name][...] = table
+        distance = views["distance"]
+        distance.fill(UNVISITED)
+        distance[p.solved] = 0
+
+        if workers > 1:
+            pool = mp.Pool(workers, initializer=_attach, initargs=(p.name, shm.name, layout))
+            run = pool.map
+        else:
+            _search = (p, shm, views)
+            run = map
+        counts = [1]
+        while counts[-1] and sum(counts) < p.size:
+            depth = len(counts) - 1
+            backward = p.size - sum(counts) < counts[-1]
+            tasks = [(backward, depth, lo, min(lo + CHUNK, p.size)) for lo in range(0, p.size, CHUNK)]
+            found = sum(run(_expand, tasks))
+            counts.append(found if backward else _count(distance, depth + 1))
+            if log:
+                log(f"  {p.name} {depth + 1:2d}: {counts[-1]:11d} {'(backward)' if backward else ''}")
+        result = distance.copy()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        _search = None
+        # The numpy views must go before the block can be closed
+        views = distance = None
+        shm.close()
+        shm.unlink()
+    return result
+
+
+def _path(table_dir, name, table):
+    return f"{table_dir}/pattern_{name}_{table}.bin"
+
+
+def build(name, table_dir=TABLE_DIR, workers=None, log=None):
+    """Build one pattern database and its move tables; the written files are checked against their CRC-32."""
+    p = pattern(name)
+    tables = p.build_move_tables()
+    distances = build_distances(p, tables, workers, log)
+    if distances.max() > 15:
+        raise ValueError(f"{name}: depth {distances.max()} does not fit into a nibble")
+    save_table(_path(table_dir, name, "distance"), MAGIC, pack_nibbles(distances), p.size)
+    for table_name, table in tables.items():
+        save_table(_path(table_dir, name, table_name), MAGIC, table.reshape(-1).view(np.uint8), table.size)
+    for table_name in p.table_names:
+        load_table(_path(table_dir, name, table_name), MAGIC, verify=True)
+    return distances
+
+
+class pattern_database:
+    """memory-mapped pattern database (読み込み専用・プロセス間で共有)
+
+    verify=True checks the CRC-32 of every file once (reads them fully).
+    """
+
+    def __init__(self, name, table_dir=TABLE_DIR, build_missing=True, verify=False, workers=None):
+        self.pattern = pattern(name)
+        self.name = name
+        try:
+            self._load(table_dir, verify)
+        except FileNotFoundError:
+            if not build_missing:
+                raise
+            build(name, table_dir, workers)
+            self._load(table_dir, verify)
+
+    def _load(self, table_dir, verify):
+        p = self.pattern
+        tables = {}
+        for table_name in p.table_names:
+            path = _path(table_dir, self.name, table_name)
+            count, payload = load_table(path, MAGIC, verify)
+            expected = p.size if table_name == "distance" else MOVE_COUNT * (
+                p.lo_size if table_name == "lo_move" else p.hi_size)
+            if count != expected:
+                raise ValueError(f"{path} has {count} entries, expected {expected}")
+            tables[table_name] = payload
+        self.packed = tables["distance"]
+        dtype = np.uint16 if self.pattern.edges is None else np.uint32
+        self.hi_move = tables["hi_move"].view(dtype)[:MOVE_COUNT * p.hi_size].reshape(p.hi_size, MOVE_COUNT)
+        if p.edges is None:
+            self.lo_move = tables["lo_move"].view(np.uint16)[:MOVE_COUNT * p.lo_size].reshape(p.lo_size, MOVE_COUNT)
+        else:
+            self.flip_mask = tables["flip_mask"][:MOVE_COUNT * p.hi_size].reshape(p.hi_size, MOVE_COUNT)
+
+    def distance(self, indices):
+        """Stored distance of coordinates (scalar or array)"""
+        return get_nibbles(self.packed, indices)
+
+    def state_distance(self, states):
+        """Lower bound on the moves that solve 3x3x3 cubie states (this pattern only)"""
+        return self.distance(self.pattern.coord(states))
+
+    def cube_distance(self, cube):
+        return self.state_distance(TABLES_3x3x3.from_cube(cube))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the 3x3x3 pattern databases")
+    parser.add_argument("--dir", default=TABLE_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--tables", nargs="+", choices=PATTERN_NAMES, default=DEFAULT_PATTERNS)
+    args = parser.parse_args()
+
+    for name in args.tables:
+        start = time.perf_counter()
+        build(name, args.dir, args.workers, log=print)
+        print(f"wrote {_path(args.dir, name, 'distance')} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import functools
+import threading
+import time
+
+import numpy as np
+
+from .geometry import face_slices
+
+# BGR colour of each grid value (0: outside the net)
+PALETTE = np.array([
+    (0, 0, 0),
+    (255, 255, 255),  # white
+    (40, 117, 232),   # orange
+    (0, 128, 0),      # green
+    (28, 0, 198),     # red
+    (28, 211, 251),   # yellow
+    (153, 51, 0),     # blue
+], dtype=np.uint8)
+# One pixel (3 bytes) as a single element, so that gathers copy whole pixels
+PIXEL = np.dtype("V3")
+
+
+class rubik_2Dmap_renderer:
+    """展開図を常駐バッファに描画し、ウィンドウへの表示は間引いて行う
+
+    render() repaints only the faces whose stickers changed since the last
+    call, through the PALETTE lookup table. show() renders and displays at
+    most max_fps times a second; a frame skipped by the rate limit stays
+    pending and goes out with the next show() (or from the background
+    thread when threaded=True). OpenCV is only imported for display.
+    """
+
+    def __init__(self, grid_shape, size=500, max_fps=30, threaded=False, window_name="rubic_2Dmap"):
+        height, width = grid_shape
+        self.window_name = window_name
+        self.interval = 1 / max_fps if max_fps else 0
+        self.image = np.zeros((size, size, 3), dtype=np.uint8)
+
+        # Grid row / column shown by every output pixel (nearest neighbour scaling)
+        self.rows = np.arange(size) * height // size
+        self.cols = np.arange(size) * width // size
+        bounds = np.searchsorted(self.rows, np.arange(height + 1)).tolist()
+
+        # Per face: its grid cells, and one (pixel rows, grid row) band per row of stickers.
+        # A band is painted by broadcasting one palette-coloured pixel line.
+        self.faces = []
+        for rs, re, cs, ce in face_slices(height // 3):
+            cells = (np.arange(rs, re)[:, None] * width + np.arange(cs, ce)[None, :]).ravel()
+            pixel_cols = slice(*np.searchsorted(self.cols, [cs, ce]).tolist())
+            bands = [(slice(bounds[r], bounds[r + 1]), r) for r in range(rs, re)]
+            self.faces.append((cells, bands, pixel_cols, self.cols[pixel_cols]))
+
+        self._drawn = None
+        self.pending = False
+        self._last_display = float("-inf")
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._display_loop, daemon=True)
+            self._thread.start()
+
+    def render(self, cube):
+        """Bring self.image up to date with cube; returns False if nothing changed."""
+        grid = np.asarray(cube)
+        flat = grid.ravel()
+        with self._lock:
+            if self._drawn is None:
+                self.image[...] = PALETTE[grid[:, self.cols]][self.rows]
+                self._drawn = flat.copy()
+                self.pending = True
+                return True
+            changed = flat != self._drawn
+            if not changed.any():
+                return False
+            for cells, bands, pixel_cols, col_cells in self.faces:
+                if changed[cells].any():
+                    for pixel_rows, row in bands:
+                        self.image[pixel_rows, pixel_cols] = PALETTE[grid[row, col_cells]]
+            self._drawn[...] = flat
+            self.pending = True
+            return True
+
+    def show(self, cube):
+        self.render(cube)
+        if self._thread is not None:
+            self._wake.set()
+        elif self.pending and time.perf_counter() - self._last_display >= self.interval:
+            self.display()
+
+    def display(self):
+        import cv2  # OpenCV is only needed for the preview window
+
+        with self._lock:
+            cv2.imshow(self.window_name, self.image)
+            self.pending = False
+        cv2.waitKey(1)
+        self._last_display = time.perf_counter()
+
+    def _display_loop(self):
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._thread is None:
+                return
+            wait = self._last_display + self.interval - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+            if self.pending:
+                self.display()
+
+    def close(self):
+        if self._thread is not None:
+            thread, self._thread = self._thread, None
+            self._wake.set()
+            thread.join()
+
+
+class image_renderer:
+    """(N, 3n, 3n) の状態をまとめて (N, H, W, 3) uint8 画像に描画する (GUI・OpenCVなし)
+
+    Every grid cell becomes a cell_size x cell_size square (H = 3n * cell_size),
+    cells outside the net are black. The palette is gathered once per grid
+    cell, one pixel row is built per grid row and copied down the cell, all
+    into work buffers kept between calls; pass out= (e.g. a shared-memory
+    view) to avoid allocating the result as well. Colours are RGB unless
+    bgr=True (OpenCV order).
+    """
+
+    def __init__(self, grid_shape, cell_size=4, bgr=False):
+        self.grid_shape = tuple(grid_shape)
+        self.cell_size = cell_size
+        height, width = self.grid_shape
+        self.image_shape = (height * cell_size, width * cell_size, 3)
+        palette = PALETTE if bgr else PALETTE[:, ::-1]
+        self._palette = np.ascontiguousarray(palette).view(PIXEL).ravel()
+        # Grid column of every pixel column
+        self._pixel_cols = np.repeat(np.arange(width), cell_size)
+        # Per grid cell colours and per grid row pixel lines, grown to the largest batch seen
+        self._colors = np.empty((0, height * width), dtype=PIXEL)
+        self._lines = np.empty((0, height, self.image_shape[1]), dtype=PIXEL)
+
+    def new_output(self, count):
+        return np.empty((count,) + self.image_shape, dtype=np.uint8)
+
+    def render(self, cubes, out=None):
+        """(N, 3n, 3n) grids -> (N, H, W, 3) uint8 images, written into out if given"""
+        cubes = np.asarray(cubes)
+        count = len(cubes)
+        if out is None:
+            out = self.new_output(count)
+        elif out.shape != (count,) + self.image_shape or out.dtype != np.uint8 or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous uint8 array of shape {(count,) + self.image_shape}")
+        if len(self._colors) < count:
+            self._colors = np.empty((count,) + self._colors.shape[1:], dtype=PIXEL)
+            self._lines = np.empty((count,) + self._lines.shape[1:], dtype=PIXEL)
+        height, width = self.grid_shape
+        colors, lines = self._colors[:count], self._lines[:count]
+
+        # mode="clip": the indices are always valid, and the default mode copies out first
+        np.take(self._palette, cubes.reshape(count, -1), out=colors, mode="clip")
+        np.take(colors.reshape(count, height, width), self._pixel_cols, axis=2, out=lines, mode="clip")
+        pixels = out.view(PIXEL).reshape(count, height, self.cell_size, self.image_shape[1])
+        pixels[...] = lines[:, :, None]
+        return out
+
+
+@functools.lru_cache(maxsize=None)
+def _renderer_for(grid_shape, cell_size, bgr):
+    return image_renderer(grid_shape, cell_size, bgr)
+
+
+def render_images(cubes, cell_size=4, out=None, bgr=False):
+    """(N, 3n, 3n) の状態の画像 (N, 3n*cell_size, 3n*cell_size, 3)。レンダラはプロセスごとに使い回す"""
+    cubes = np.asarray(cubes)
+    return _renderer_for(cubes.shape[1:], cell_size, bgr).render(cubes, out)
@@ -0,0 +1,118 @@
+"""Seeded scrambles without wasted moves.
+
+scramble_moves() draws update() indices for a whole batch at once from a
+numpy.random.Generator and never emits a move that cancels or merges with
+the previous ones:
+* no move followed by its inverse (R Ri),
+* at most two equal quarter turns in a row (R R is a half turn, R R R is Ri),
+* turns of opposite faces commute, so only one order is kept (R L, never L R);
+  on cubes larger than 3x3x3 the same goes for all the layers of one axis,
+* the 2x2x2 only turns R, U and F: it has no middle layer, so L is R
+  followed by a whole-cube rotation (R Li turns the whole cube).
+
+random_states_2x2x2() / random_states_3x3x3() skip the walk altogether and
+draw states uniformly from all reachable positions.
+"""
+import functools
+
+import numpy as np
+
+MOVE_COUNT = 12
+
+
+def _allowed(state, move, axes):
+    # state: previous move, + len(axes) if it was already repeated; 2 * len(axes) at the beginning
+    count = len(axes)
+    if state == 2 * count:
+        return True
+    prev, repeated = state % count, state >= count
+    if move == prev:
+        return not repeated
+    # Moves 2k and 2k+1 turn the same layer; layers on one axis commute
+    layer, prev_layer = move // 2, prev // 2
+    if layer == prev_layer:
+        return False
+    return not (axes[move] == axes[prev] and layer < prev_layer)
+
+
+@functools.lru_cache(maxsize=None)
+def _choice_tables(n=3):
+    # Outer moves only up to the 3x3x3 (its slices would move the centres);
+    # larger cubes need the inner slices to reach every state
+    from .cube_nxnxn import move_axes
+
+    axes = move_axes(n) if n > 3 else move_axes(3)[:MOVE_COUNT]
+    count = len(axes)
+    allowed = np.array([[_allowed(s, m, axes) for m in range(count)] for s in range(2 * count + 1)])
+    if n == 2:
+        from .distance_2x2x2 import FIXED_CORNER_MOVES
+
+        allowed[:, np.setdiff1d(np.arange(count), FIXED_CORNER_MOVES)] = False
+    counts = allowed.sum(axis=1)
+    choices = np.zeros(allowed.shape, dtype=np.intp)
+    for s, row in enumerate(allowed):
+        choices[s, :counts[s]] = np.flatnonzero(row)
+    return choices, counts, (choices.tolist(), counts.tolist())
+
+
+def scramble_moves(rng, count, depth, n=3):
+    """(count, depth) array of update() indices of an nxnxn cube; rng is a Generator or a seed."""
+    rng = np.random.default_rng(rng)
+    choices, counts, lists = _choice_tables(n)
+    start = len(choices) - 1
+    uniforms = rng.random((depth, count))
+    if count == 1:
+        return np.array([_scramble_one(uniforms[:, 0].tolist(), lists, start)], dtype=np.intp).reshape(1, depth)
+    moves = np.empty((count, depth), dtype=np.intp)
+    state = np.full(count, start, dtype=np.intp)
+    for step in range(depth):
+        pick = (uniforms[step] * counts[state]).astype(np.intp)
+        move = choices[state, pick]
+        state = move + start // 2 * (move == state)
+        moves[:, step] = move
+    return moves
+
+
+def _scramble_one(uniforms, lists, state):
+    # Plain Python is faster than numpy for a single cube (shuffle())
+    choices, counts = lists
+    repeat = len(counts) // 2
+    moves = []
+    for u in uniforms:
+        move = choices[state][int(u * counts[state])]
+        state = move + repeat * (move == state)
+        moves.append(move)
+    return moves
+
+
+def scramble_cubes(cubes, depth, rng):
+    """Scramble (N, 3n, 3n) grids in place; returns the moves used."""
+    from .cube_nxnxn import move_tables
+
+    n = cubes.shape[-1] // 3
+    move_perms = move_tables(n)
+    flat_perms = move_perms.reshape(len(move_perms), -1)
+    flat = cubes.reshape(len(cubes), -1)
+    moves = scramble_moves(rng, len(cubes), depth, n)
+    for step in range(depth):
+        flat[...] = np.take_along_axis(flat, flat_perms[moves[:, step]], axis=1)
+    return moves
+
+
+def random_states_2x2x2(rng, count):
+    """count grids (count, 6, 6) drawn uniformly from all 88,179,840 positions."""
+    from .coord import CORNER_COUNT, corner_uncoord
+    from .cubie import TABLES_2x2x2
+
+    rng = np.random.default_rng(rng)
+    return TABLES_2x2x2.to_cube(corner_uncoord(rng.integers(0, CORNER_COUNT, size=count)))
+
+
+def random_states_3x3x3(rng, count):
+    """count grids (count, 9, 9) drawn uniformly from all reachable positions."""
+    from .coord import CORNER_COUNT, EDGE_COUNT, decode_3x3x3
+    from .cubie import TABLES_3x3x3
+
+    rng = np.random.default_rng(rng)
+    states = decode_3x3x3(rng.integers(0, CORNER_COUNT, size=count), rng.integers(0, EDGE_COUNT, size=count))
+    return TABLES_3x3x3.to_cube(states)
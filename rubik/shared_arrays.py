@@ -0,0 +1,21 @@
+"""Named arrays laid out back to back in one buffer.
+
+A layout is a list of (name, dtype, shape). Processes that map the same
+block (multiprocessing.shared_memory) with the same layout see the same
+arrays; a bytearray works for the single-process case.
+"""
+import numpy as np
+
+
+def layout_nbytes(layout):
+    return sum(np.dtype(dtype).itemsize * int(np.prod(shape)) for _, dtype, shape in layout)
+
+
+def layout_views(buf, layout):
+    """{name: ndarray} views into buf, in layout order"""
+    views = {}
+    offset = 0
+    for name, dtype, shape in layout:
+        views[name] = np.ndarray(shape, dtype=dtype, buffer=buf, offset=offset)
+        offset += views[name].nbytes
+    return views
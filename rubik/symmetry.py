@@ -0,0 +1,108 @@
+import itertools
+
+import numpy as np
+
+from . import cube_2x2x2, cube_3x3x3
+from .geometry import FACE_NORMALS, facelet_table
+
+
+def symmetry_matrices():
+    """The 48 rotations and reflections of the cube as signed permutation matrices (index 0: identity)."""
+    matrices = []
+    for axes in itertools.permutations(range(3)):
+        for signs in itertools.product((1, -1), repeat=3):
+            m = np.zeros((3, 3), dtype=np.int64)
+            m[np.arange(3), axes] = signs
+            matrices.append(m)
+    return np.array(matrices)
+
+
+class symmetry_tables:
+    """48 通りの対称変換 (回転・鏡映 + 色の付け替え) の表
+
+    Symmetry s maps a grid to colour_maps[s][grid.flat[position_perms[s]]]:
+    the cube is turned (or mirrored) by matrices[s] and the colours are
+    renamed so that the centres read as before. The solved cube is fixed by
+    every symmetry, and move_map[s, m] is the update() index that plays the
+    role of move m on the transformed cube.
+    """
+
+    def __init__(self, n, move_perms):
+        self.n = n
+        self.matrices = symmetry_matrices()
+        flat, faces, positions = facelet_table(n)
+        self.facelets = flat
+        cells = (3 * n) ** 2
+        lookup = {(tuple(p), f): i for i, (p, f) in enumerate(zip(positions, faces))}
+        normal_face = {tuple(v): f for f, v in enumerate(FACE_NORMALS)}
+
+        count = len(self.matrices)
+        self.position_perms = np.tile(np.arange(cells), (count, 1))
+        self.color_maps = np.zeros((count, 7), dtype=np.uint8)
+        for s, m in enumerate(self.matrices):
+            face_map = [normal_face[tuple(m @ v)] for v in FACE_NORMALS]
+            self.color_maps[s, 1:] = np.array(face_map) + 1
+            for src, (p, f) in enumerate(zip(positions, faces)):
+                dest = lookup[(tuple(m @ p), face_map[f])]
+                self.position_perms[s, flat[dest]] = flat[src]
+
+        self.inverse = np.array([
+            next(t for t in range(count) if (self.matrices[t] == m.T).all()) for m in self.matrices])
+
+        move_perms = np.asarray(move_perms).reshape(len(move_perms), -1)
+        self.move_map = np.empty((count, len(move_perms)), dtype=np.intp)
+        for s, sigma in enumerate(self.position_perms):
+            sigma_inv = np.argsort(sigma)
+            for m, pi in enumerate(move_perms):
+                conjugated = sigma_inv[pi[sigma]]
+                self.move_map[s, m] = np.flatnonzero((move_perms == conjugated).all(axis=1))[0]
+
+        # Canonical comparison only looks at the stickers: cell of every sticker of all 48
+        # transforms in one row, and colour c under symmetry s at _color_table[s * 7 + c]
+        self._facelet_perms = self.position_perms[:, flat].ravel()
+        self._color_offsets = (np.arange(count, dtype=np.intp) * 7)[:, None]
+        self._color_table = self.color_maps.ravel()
+        for table in (self.position_perms, self.color_maps, self.inverse, self.move_map, self._facelet_perms):
+            table.setflags(write=False)
+
+    def apply(self, cubes, syms):
+        """Transform (..., 3n, 3n) grids by symmetry indices syms (scalar or matching batch shape)."""
+        cubes = np.asarray(cubes)
+        syms = np.broadcast_to(syms, cubes.shape[:-2])
+        flat = cubes.reshape(cubes.shape[:-2] + (-1,))
+        moved = np.take_along_axis(flat, self.position_perms[syms], axis=-1)
+        relabeled = np.take_along_axis(self.color_maps[syms], moved.astype(np.intp), axis=-1)
+        return relabeled.reshape(cubes.shape)
+
+    def canonicalize(self, cubes):
+        """Return (canonical grid, symmetry used) for one grid or a batch.
+
+        The representative is the lexicographically smallest sticker sequence
+        among the 48 transforms; apply(canonical, inverse[sym]) restores the input.
+        """
+        cubes = np.asarray(cubes)
+        single = cubes.ndim == 2
+        batch = cubes.reshape((-1,) + cubes.shape[-2:])
+        flat = batch.reshape(len(batch), -1)
+
+        count = len(self.color_maps)
+        moved = flat.take(self._facelet_perms, axis=1).reshape(len(flat), count, -1)
+        stickers = self._color_table.take(moved + self._color_offsets)
+        # Sticker colours are never 0, so a bytes view compares like the sequence
+        syms = stickers.view(f"S{stickers.shape[-1]}")[..., 0].argmin(axis=1)
+
+        canonical = self.apply(batch, syms)
+        if single:
+            return canonical[0], int(syms[0])
+        return canonical.reshape(cubes.shape), syms.reshape(cubes.shape[:-2])
+
+
+SYMMETRY_3x3x3 = symmetry_tables(3, cube_3x3x3.MOVE_PERMS)
+SYMMETRY_2x2x2 = symmetry_tables(2, cube_2x2x2.MOVE_PERMS)
+
+
+def canonicalize(cube):
+    """Canonical representative and symmetry index of a (9, 9) or (6, 6) grid (or a batch of them)."""
+    cube = np.asarray(cube)
+    tables = SYMMETRY_3x3x3 if cube.shape[-1] == 9 else SYMMETRY_2x2x2
+    return tables.canonicalize(cube)
@@ -0,0 +1,76 @@
+"""Binary table files shared by the solvers.
+
+File layout: 8-byte magic, uint32 version, uint64 entry count, uint32
+CRC-32 of the payload (version 2; version 1 files have no checksum), then
+the raw uint8 payload. Tables are opened with np.memmap (read-only), so
+every process that loads the same file shares the OS page cache instead
+of holding its own copy.
+"""
+import os
+import struct
+import zlib
+
+import numpy as np
+
+TABLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables")
+
+_HEADER_V1 = struct.Struct("<8sIQ")
+_HEADER = struct.Struct("<8sIQI")
+VERSION = 2
+# Bytes checksummed per zlib.crc32 call
+_CHECKSUM_CHUNK = 1 << 24
+
+
+def table_path(name):
+    return os.path.join(TABLE_DIR, name)
+
+
+def pack_nibbles(values):
+    """Pack values 0..15 two per byte (even index in the low nibble)."""
+    values = np.asarray(values, dtype=np.uint8)
+    if len(values) % 2:
+        values = np.append(values, np.uint8(0))
+    return values[0::2] | (values[1::2] << 4)
+
+
+def get_nibbles(packed, indices):
+    indices = np.asarray(indices, dtype=np.int64)
+    return (packed[indices >> 1] >> ((indices & 1) << 2).astype(np.uint8)) & 0x0F
+
+
+def checksum(payload):
+    """CRC-32 of a uint8 array (memmaps are read in chunks)."""
+    payload = np.asarray(payload, dtype=np.uint8).reshape(-1)
+    crc = 0
+    for start in range(0, len(payload), _CHECKSUM_CHUNK):
+        crc = zlib.crc32(payload[start:start + _CHECKSUM_CHUNK], crc)
+    return crc
+
+
+def save_table(path, magic, payload, count):
+    """payload (uint8) を一時ファイルに書き、書き終えてから置き換える"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    payload = np.ascontiguousarray(payload, dtype=np.uint8)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(magic, VERSION, count, checksum(payload)))
+        payload.tofile(f)
+    os.replace(tmp_path, path)
+
+
+def load_table(path, magic, verify=False):
+    """Return (entry count, read-only uint8 memmap of the payload).
+
+    verify=True reads the whole payload once and raises ValueError if it
+    does not match the stored checksum (version 1 files are not checked).
+    """
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+    file_magic, version, count = _HEADER_V1.unpack_from(head)
+    if file_magic != magic or version not in (1, VERSION):
+        raise ValueError(f"{path} is not a {magic.decode()} v{VERSION} table")
+    header = _HEADER if version == VERSION else _HEADER_V1
+    payload = np.memmap(path, dtype=np.uint8, mode="r", offset=header.size)
+    if verify and version == VERSION and checksum(payload) != header.unpack_from(head)[3]:
+        raise ValueError(f"{path} is corrupt (checksum mismatch)")
+    return count, payload
@@ -0,0 +1,214 @@
+"""Append-only binary log of cube states.
+
+File layout: 8-byte magic, uint32 version, uint32 grid height and width,
+then fixed-size records (little endian, unpadded):
+    time  float64   UNIX time of the record
+    move  int8      update() index that led to the state (-1: none)
+    cube  uint8     the (height, width) grid
+
+Record i starts at HEADER_SIZE + i * record size, so the file is its own
+index: read_log() memory-maps all records as one structured array and
+find_time() looks records up by timestamp. A record cut short by a crash
+is dropped the next time the log is opened for appending.
+
+Convert the old per-second pickles with:
+    python -m rubik.trajectory convert [--pattern "savefiles/*/cube_*.pkl"] [--out-dir savefiles]
+"""
+import argparse
+import glob
+import os
+import pickle
+import struct
+import time
+from datetime import datetime
+
+import numpy as np
+
+MAGIC = b"RBKTRLOG"
+VERSION = 1
+_HEADER = struct.Struct("<8sIII")
+HEADER_SIZE = _HEADER.size
+SAVE_DIR = "savefiles"
+
+
+def record_dtype(shape):
+    return np.dtype([("time", "<f8"), ("move", "i1"), ("cube", "u1", tuple(shape))])
+
+
+def log_path(n, directory=SAVE_DIR):
+    """Default log of the nxnxn cube (one log per grid size)."""
+    return os.path.join(directory, f"cube_{n}x{n}x{n}.traj")
+
+
+def _read_header(f, path):
+    magic, version, height, width = _HEADER.unpack(f.read(HEADER_SIZE))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a {MAGIC.decode()} v{VERSION} log")
+    return (height, width)
+
+
+def is_log(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+class trajectory_log:
+    """状態・手・時刻を固定長レコードとして追記するログ
+
+    Opens (or creates) the log at path for appending; shape is the grid
+    shape and is only needed for a new file.
+    """
+
+    def __init__(self, path, shape=None):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                self.shape = _read_header(f, path)
+            if shape is not None and tuple(shape) != self.shape:
+                raise ValueError(f"{path} holds {self.shape} grids, not {tuple(shape)}")
+            self.dtype = record_dtype(self.shape)
+            self.count, partial = divmod(os.path.getsize(path) - HEADER_SIZE, self.dtype.itemsize)
+            if partial:
+                os.truncate(path, HEADER_SIZE + self.count * self.dtype.itemsize)
+            self._file = open(path, "ab")
+        else:
+            if shape is None:
+                raise ValueError("shape is needed to create a new log")
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.shape = tuple(shape)
+            self.dtype = record_dtype(self.shape)
+            self.count = 0
+            self._file = open(path, "ab")
+            self._file.write(_HEADER.pack(MAGIC, VERSION, *self.shape))
+        self._record = np.zeros(1, dtype=self.dtype)
+
+    def append(self, cube, move=-1, timestamp=None):
+        """Write one record; returns its index."""
+        record = self._record
+        record["time"] = time.time() if timestamp is None else timestamp
+        record["move"] = move
+        record["cube"] = cube
+        self._file.write(record.tobytes())
+        self.count += 1
+        return self.count - 1
+
+    def extend(self, cubes, moves=-1, timestamps=None):
+        """Write a batch of records with one write call."""
+        cubes = np.asarray(cubes)
+        records = np.zeros(len(cubes), dtype=self.dtype)
+        records["time"] = time.time() if timestamps is None else timestamps
+        records["move"] = moves
+        records["cube"] = cubes
+        self._file.write(records.tobytes())
+        self.count += len(records)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(path):
+    """All complete records as a read-only structured memmap (fields time, move, cube)."""
+    with open(path, "rb") as f:
+        shape = _read_header(f, path)
+    dtype = record_dtype(shape)
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def find_time(records, timestamp):
+    """Index of the first record at or after timestamp (records are in time order)."""
+    return int(np.searchsorted(records["time"], timestamp))
+
+
+def load_cube(path, index=-1):
+    """Grid of record `index` of a log, or the grid of an old pickle save."""
+    if not is_log(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    return np.array(read_log(path)["cube"][index])
+
+
+def _pickle_time(path):
+    # savefiles/YYYYMMDD/cube_HHMMSS.pkl
+    day = os.path.basename(os.path.dirname(path))
+    clock = os.path.splitext(os.path.basename(path))[0].split("_")[-1]
+    try:
+        return datetime.strptime(day + clock, "%Y%m%d%H%M%S").timestamp()
+    except ValueError:
+        return os.path.getmtime(path)
+
+
+def _logged(path, items):
+    # (time, grid bytes) of the records of the log at path with the timestamps of items
+    if not os.path.exists(path):
+        return set()
+    records = read_log(path)
+    records = records[np.isin(records["time"], [t for t, _ in items])]
+    return {(float(t), c.tobytes()) for t, c in zip(records["time"], records["cube"])}
+
+
+def convert_pickles(pattern=os.path.join(SAVE_DIR, "*", "cube_*.pkl"), out_dir=SAVE_DIR):
+    """Append every pickled grid (oldest first) to the log of its size; returns {path: count}.
+
+    The pickles are left in place. Grids already in the log with the same
+    timestamp are skipped, so converting again only adds new saves.
+    """
+    saves = sorted((_pickle_time(p), p) for p in glob.glob(pattern))
+    grouped = {}
+    for timestamp, p in saves:
+        with open(p, "rb") as f:
+            cube = np.asarray(pickle.load(f), dtype=np.uint8)
+        grouped.setdefault(cube.shape, []).append((timestamp, cube))
+
+    written = {}
+    for shape, items in grouped.items():
+        path = log_path(shape[0] // 3, out_dir)
+        logged = _logged(path, items)
+        items = [(t, c) for t, c in items if (t, c.tobytes()) not in logged]
+        if items:
+            with trajectory_log(path, shape) as log:
+                log.extend(np.stack([c for _, c in items]), -1, np.array([t for t, _ in items]))
+        written[path] = len(items)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trajectory log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("convert", help="append the old cube_*.pkl saves to logs")
+    convert.add_argument("--pattern", default=os.path.join(SAVE_DIR, "*", "cube_*.pkl"))
+    convert.add_argument("--out-dir", default=SAVE_DIR)
+    info = sub.add_parser("info", help="print the record count and time range of a log")
+    info.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        written = convert_pickles(args.pattern, args.out_dir)
+        for path, count in written.items():
+            print(f"{path}: +{count} records")
+        if not written:
+            print(f"no files match {args.pattern}")
+    else:
+        records = read_log(args.path)
+        print(f"{args.path}: {len(records)} records of {records.dtype['cube'].shape} grids")
+        if len(records):
+            first, last = (datetime.fromtimestamp(t) for t in records["time"][[0, -1]])
+            print(f"  {first:%Y-%m-%d %H:%M:%S} .. {last:%Y-%m-%d %H:%M:%S}")
+
+
+if __name__ == "__main__":
+    main()
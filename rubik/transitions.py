@@ -0,0 +1,158 @@
+"""Bounded memo of (state, move) -> next state in front of update().
+
+Attach one transition_cache to any number of cubes of the same size:
+    cache = transition_cache(3, max_bytes=256 << 20)
+    cube.transitions = cache       # rubik_nxnxn or rubik_nxnxn_batch
+update() then looks the pair up by the state's Zobrist hash (rubik/zobrist.py)
+and copies the stored next grid and its hash on a hit. Only misses are
+turned, and they are stored in the slot chosen by CLOCK eviction (a
+second-chance approximation of LRU: every hit sets a reference bit, the
+clock hand clears set bits and evicts the first clear one).
+
+Entries are identified by 64-bit hashes only, so two pairs that collide
+(probability about 2^-64) would share an entry.
+"""
+import numpy as np
+
+from .zobrist import tables_for_hash
+
+# Bookkeeping per entry besides the stored grid: next hash, key, reference bit and the dict item
+ENTRY_OVERHEAD = 8 + 8 + 1 + 120
+
+
+class transition_cache:
+    """(状態, 回転) → 次の状態 の有界キャッシュ (CLOCK置換、ヒット/ミス数を記録)"""
+
+    def __init__(self, n, max_bytes=64 << 20):
+        self.n = n
+        cells = 9 * n * n
+        self.capacity = max(int(max_bytes) // (cells + ENTRY_OVERHEAD), 1)
+        self._zobrist = tables_for_hash(n)
+        self._move_keys = self._zobrist.move_keys
+        self._move_key_list = self._zobrist._move_key_list
+
+        self.next_cubes = np.zeros((self.capacity, 3 * n, 3 * n), dtype=np.uint8)
+        self.next_hashes = np.zeros(self.capacity, dtype=np.uint64)
+        self._keys = np.zeros(self.capacity, dtype=np.uint64)
+        # Reference bits: a bytearray for the single-cube path, a bool view of it for the batched one
+        self._referenced_bytes = bytearray(self.capacity)
+        self._referenced = np.frombuffer(self._referenced_bytes, dtype=bool)
+        # key -> slot; slots are filled in order until the cache is full, then recycled by the clock hand
+        self._index = {}
+        self._hand = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self), "capacity": self.capacity, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "hit_rate": self.hit_rate}
+
+    def clear(self):
+        self._index.clear()
+        self._referenced[...] = False
+        self._hand = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def _free_slots(self, count):
+        """count slots to store new entries in: unused ones first, then CLOCK victims"""
+        used = len(self._index)
+        fresh = np.arange(used, min(used + count, self.capacity))
+        count -= len(fresh)
+        if count == 0:
+            return fresh
+        # Occupied slots in clock order. Referenced ones get a second chance (their bit is
+        # cleared as the hand passes), the first count clear ones are evicted.
+        order = (self._hand + np.arange(used)) % used
+        clear = np.flatnonzero(~self._referenced[order])
+        if len(clear) >= count:
+            passed = clear[count - 1] + 1
+            victims = order[clear[:count]]
+        else:
+            # A full pass clears every bit; the rest come from the start of the second pass
+            second = np.flatnonzero(self._referenced[order])[:count - len(clear)]
+            passed = len(order) + second[-1] + 1
+            victims = np.concatenate([order[clear], order[second]])
+        self._referenced[order[:passed]] = False
+        self._hand = (self._hand + passed) % self.capacity
+        for key in self._keys[victims].tolist():
+            del self._index[key]
+        self.evictions += len(victims)
+        return np.concatenate([fresh, victims])
+
+    def _victim(self):
+        # Single-entry CLOCK: clear reference bits until an unreferenced slot comes up
+        referenced = self._referenced_bytes
+        hand = self._hand
+        while referenced[hand]:
+            referenced[hand] = 0
+            hand = (hand + 1) % self.capacity
+        self._hand = (hand + 1) % self.capacity
+        del self._index[self._keys.item(hand)]
+        self.evictions += 1
+        return hand
+
+    def step(self, cube, rotate_index):
+        """rubik_nxnxn.update() through the cache"""
+        key = cube.state_hash() ^ self._move_key_list[rotate_index]
+        slot = self._index.get(key)
+        if slot is not None:
+            self.hits += 1
+            self._referenced_bytes[slot] = 1
+            cube.set_cube(self.next_cubes[slot], self.next_hashes.item(slot))
+            return
+
+        self.misses += 1
+        cube._turn(rotate_index)
+        slot = len(self._index) if len(self._index) < self.capacity else self._victim()
+        self.next_cubes[slot] = cube.cube
+        self.next_hashes[slot] = cube.state_hash()
+        self._keys[slot] = key
+        self._referenced_bytes[slot] = 0
+        self._index[key] = slot
+
+    def step_batch(self, batch, rotate_indices):
+        """rubik_nxnxn_batch.update() through the cache: hits are copied, only misses are turned"""
+        rotate_indices = np.asarray(rotate_indices, dtype=np.intp)
+        keys = batch.state_hash() ^ self._move_keys[rotate_indices]
+        index = self._index
+        slots = np.array([index.get(key, -1) for key in keys.tolist()], dtype=np.intp)
+        hit = slots >= 0
+        hits = np.flatnonzero(hit)
+        misses = np.flatnonzero(~hit)
+        self.hits += len(hits)
+        self.misses += len(misses)
+
+        if len(misses):
+            # Turn the misses from their current state before the hits overwrite the batch
+            turned, turned_hashes = batch._turned(misses, rotate_indices[misses])
+            slots[misses] = 0
+        self._referenced[slots[hits]] = True
+        np.take(self.next_cubes, slots, axis=0, out=batch.cubes)
+        np.take(self.next_hashes, slots, out=batch._hashes)
+        if len(misses) == 0:
+            return
+        batch.set_cubes(misses, turned, turned_hashes)
+
+        # Cubes in the same state making the same move need one entry
+        new_keys, first = np.unique(keys[misses], return_index=True)
+        first = first[:self.capacity]
+        new_keys = new_keys[:self.capacity]
+        free = self._free_slots(len(first))
+        self.next_cubes[free] = turned[first]
+        self.next_hashes[free] = turned_hashes[first]
+        self._keys[free] = new_keys
+        self._referenced[free] = False
+        index.update(zip(new_keys.tolist(), free.tolist()))
+
+    @property
+    def nbytes(self):
+        return self.capacity * (self.next_cubes[0].nbytes + ENTRY_OVERHEAD)
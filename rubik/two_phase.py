@@ -0,0 +1,365 @@
+"""Two-phase (Kociemba) solver for rubik_3x3x3.
+
+Phase 1 brings the cube into <U, D, R2, L2, F2, B2> (corners and edges
+oriented, FR/FL/BL/BR in the middle slice), phase 2 solves it inside that
+group. Both phases are IDA* searches on coordinate move tables with
+pruning tables as heuristic.
+
+Tables (about 6 MB) are generated once, in a few seconds with numpy:
+    python -m rubik.two_phase [--dir rubik/tables]
+
+and then opened with np.memmap, so start-up only maps the files and all
+solver processes share the same pages.
+
+Internally the search uses the 18 face turns (quarter and half turns);
+solve() expands them to update() indices, a half turn becoming two
+quarter turns.
+
+The first solution is rarely the shortest one (phase 1 stops at the first
+way into the group), so the search goes on with the bound one turn below
+the best solution so far until max_time seconds have passed or no shorter
+solution is left.
+"""
+import argparse
+import time
+from itertools import combinations
+
+import numpy as np
+
+from .coord import ori_index, ori_unindex, perm_rank, perm_unrank
+from .cubie import TABLES_3x3x3
+from .table_store import TABLE_DIR, load_table, save_table
+
+# (clockwise, counter-clockwise) update() index for the faces R, L, U, D, F, B
+FACE_TURNS = [(0, 1), (3, 2), (5, 4), (6, 7), (8, 9), (11, 10)]
+FACE_NAMES = "RLUDFB"
+
+# Solver move m = 3 * face + power - 1 (power 1: clockwise, 2: half, 3: counter-clockwise)
+SOLVER_MOVES = [turns for cw, ccw in FACE_TURNS for turns in ([cw], [cw, cw], [ccw])]
+# U, U2, U', D, D2, D', R2, L2, F2, B2
+PHASE2_MOVES = [6, 7, 8, 9, 10, 11, 1, 4, 13, 16]
+
+N_TWIST = 3 ** 7
+N_FLIP = 2 ** 11
+N_SLICE = 495        # positions of the 4 slice edges among 12 slots
+N_CORNER = 40320     # corner permutation
+N_UD_EDGE = 40320    # permutation of the 8 U/D edges (phase 2)
+N_SLICE_PERM = 24    # permutation of the 4 slice edges (phase 2)
+
+
+def _allowed_moves(moves):
+    """(table column, move, face) lists indexed by the previous face + 1.
+
+    No two turns of one face in a row, and opposite faces only in one order.
+    """
+    allowed = []
+    for last_face in range(-1, 6):
+        allowed.append([(i, m, m // 3) for i, m in enumerate(moves)
+                        if not (m // 3 >> 1 == last_face >> 1 and m // 3 <= last_face)])
+    return allowed
+
+
+PHASE1_ALLOWED = _allowed_moves(range(18))
+PHASE2_ALLOWED = _allowed_moves(PHASE2_MOVES)
+
+_SLICE_EDGES = np.arange(8, 12)
+_COMBINATIONS = list(combinations(range(12), 4))
+
+
+def _slice_rank(positions):
+    """Combinadic rank of sorted slot positions (..., 4); the solved slice (8-11) is 494."""
+    positions = np.asarray(positions, dtype=np.int64)
+    rank = np.zeros(positions.shape[:-1], dtype=np.int64)
+    for k in range(4):
+        p = positions[..., k]
+        # C(p, k + 1) for k + 1 <= 4, without float
+        c = np.ones_like(p)
+        for i in range(k + 1):
+            c = c * (p - i) // (i + 1)
+        rank += np.where(p >= k + 1, c, 0)
+    return rank
+
+
+SLICE_SOLVED = int(_slice_rank(_SLICE_EDGES))
+
+
+def apply_moves(states, solver_moves):
+    """Apply solver move(s) to cubie states; solver_moves broadcasts against the batch."""
+    states = np.asarray(states)
+    solver_moves = np.broadcast_to(solver_moves, states.shape[:-1])
+    turns = np.array([SOLVER_MOVES[m] + [-1] * (2 - len(SOLVER_MOVES[m])) for m in range(18)])
+    for step in range(2):
+        quarter = turns[solver_moves, step]
+        active = quarter >= 0
+        moved = TABLES_3x3x3.move(states, np.where(active, quarter, 0))
+        states = np.where(active[..., None], moved, states)
+    return states
+
+
+# --- Coordinates of cubie states (vectorized) ---
+def twist_coord(states):
+    return ori_index(states[..., 8:16], 3)
+
+
+def flip_coord(states):
+    return ori_index(states[..., 28:40], 2)
+
+
+def slice_coord(states):
+    ep = states[..., 16:28]
+    in_slice = ep >= 8
+    positions = np.nonzero(in_slice)[-1].reshape(ep.shape[:-1] + (4,))
+    return _slice_rank(positions)
+
+
+def corner_coord(states):
+    return perm_rank(states[..., 0:8])
+
+
+def ud_edge_coord(states):
+    return perm_rank(states[..., 16:24])
+
+
+def slice_perm_coord(states):
+    return perm_rank(states[..., 24:28].astype(np.int64) - 8)
+
+
+def _solved(count):
+    return np.broadcast_to(TABLES_3x3x3.solved_state, (count, 40)).copy()
+
+
+def _move_table(states, coord, moves):
+    table = np.empty((len(states), len(moves)), dtype=np.uint16)
+    for i, m in enumerate(moves):
+        table[:, i] = coord(apply_moves(states, m))
+    return table
+
+
+def build_move_tables():
+    all_moves = list(range(18))
+
+    twist = _solved(N_TWIST)
+    twist[:, 8:16] = ori_unindex(np.arange(N_TWIST), 8, 3)
+    flip = _solved(N_FLIP)
+    flip[:, 28:40] = ori_unindex(np.arange(N_FLIP), 12, 2)
+
+    slices = _solved(N_SLICE)
+    for positions in _COMBINATIONS:
+        rank = int(_slice_rank(positions))
+        others = [p for p in range(12) if p not in positions]
+        slices[rank, 16 + np.array(positions)] = _SLICE_EDGES
+        slices[rank, 16 + np.array(others)] = np.arange(8)
+
+    corners = _solved(N_CORNER)
+    corners[:, 0:8] = perm_unrank(np.arange(N_CORNER), 8)
+    ud_edges = _solved(N_UD_EDGE)
+    ud_edges[:, 16:24] = perm_unrank(np.arange(N_UD_EDGE), 8)
+    slice_perms = _solved(N_SLICE_PERM)
+    slice_perms[:, 24:28] = perm_unrank(np.arange(N_SLICE_PERM), 4) + 8
+
+    return {
+        "twist_move": _move_table(twist, twist_coord, all_moves),
+        "flip_move": _move_table(flip, flip_coord, all_moves),
+        "slice_move": _move_table(slices, slice_coord, all_moves),
+        "corner_move": _move_table(corners, corner_coord, all_moves),
+        "ud_edge_move": _move_table(ud_edges, ud_edge_coord, PHASE2_MOVES),
+        "slice_perm_move": _move_table(slice_perms, slice_perm_coord, PHASE2_MOVES),
+    }
+
+
+def _bfs(move_a, move_b, start_a, start_b):
+    """Distance table over (a, b) = a * len(move_b) + b, breadth-first from (start_a, start_b)."""
+    size_b = len(move_b)
+    move_a = move_a.astype(np.int64)
+    move_b = move_b.astype(np.int64)
+    distances = np.full(len(move_a) * size_b, 255, dtype=np.uint8)
+    frontier = np.array([start_a * size_b + start_b], dtype=np.int64)
+    distances[frontier] = 0
+    depth = 0
+    while len(frontier):
+        a, b = np.divmod(frontier, size_b)
+        neighbours = (move_a[a] * size_b + move_b[b]).ravel()
+        neighbours = np.unique(neighbours[distances[neighbours] == 255])
+        depth += 1
+        distances[neighbours] = depth
+        frontier = neighbours
+    return distances
+
+
+def build_pruning_tables(move_tables):
+    phase2_corner = move_tables["corner_move"][:, PHASE2_MOVES]
+    return {
+        "slice_twist_prune": _bfs(move_tables["slice_move"], move_tables["twist_move"], SLICE_SOLVED, 0),
+        "slice_flip_prune": _bfs(move_tables["slice_move"], move_tables["flip_move"], SLICE_SOLVED, 0),
+        "corner_slice_prune": _bfs(phase2_corner, move_tables["slice_perm_move"], 0, 0),
+        "edge_slice_prune": _bfs(move_tables["ud_edge_move"], move_tables["slice_perm_move"], 0, 0),
+    }
+
+
+MAGIC = b"RBK3KOCI"
+TABLE_NAMES = [
+    "twist_move", "flip_move", "slice_move", "corner_move", "ud_edge_move", "slice_perm_move",
+    "slice_twist_prune", "slice_flip_prune", "corner_slice_prune", "edge_slice_prune",
+]
+
+
+def _path(table_dir, name):
+    return f"{table_dir}/two_phase_{name}.bin"
+
+
+def build(table_dir=TABLE_DIR):
+    tables = build_move_tables()
+    tables.update(build_pruning_tables(tables))
+    for name in TABLE_NAMES:
+        table = np.ascontiguousarray(tables[name])
+        save_table(_path(table_dir, name), MAGIC, table.reshape(-1).view(np.uint8), table.size)
+    return tables
+
+
+def load_tables(table_dir=TABLE_DIR, build_missing=True):
+    """Memory-map every table as a flat memoryview (fast int indexing, no copy)."""
+    tables = {}
+    for name in TABLE_NAMES:
+        try:
+            count, payload = load_table(_path(table_dir, name), MAGIC)
+        except FileNotFoundError:
+            if not build_missing:
+                raise
+            build(table_dir)
+            return load_tables(table_dir, build_missing=False)
+        dtype = np.uint8 if name.endswith("_prune") else np.uint16
+        tables[name] = memoryview(payload.view(dtype)[:count])
+    return tables
+
+
+class two_phase_solver:
+    """rubik_3x3x3 の状態を二段階法で解き、update() のインデックス列を返す"""
+
+    def __init__(self, table_dir=TABLE_DIR, build_missing=True):
+        tables = load_tables(table_dir, build_missing)
+        self.twist_move = tables["twist_move"]
+        self.flip_move = tables["flip_move"]
+        self.slice_move = tables["slice_move"]
+        self.corner_move = tables["corner_move"]
+        self.ud_edge_move = tables["ud_edge_move"]
+        self.slice_perm_move = tables["slice_perm_move"]
+        self.slice_twist_prune = tables["slice_twist_prune"]
+        self.slice_flip_prune = tables["slice_flip_prune"]
+        self.corner_slice_prune = tables["corner_slice_prune"]
+        self.edge_slice_prune = tables["edge_slice_prune"]
+        self.nodes = 0
+
+    def solve(self, cube, max_length=24, max_time=0.5):
+        """Solve a (9, 9) grid; returns a list of update() indices (None if not found).
+
+        max_length bounds the solution in face turns (half turns count as one);
+        max_time is the time in seconds spent shortening the first solution.
+        """
+        moves = self.solve_state(TABLES_3x3x3.from_cube(cube), max_length, max_time)
+        if moves is None:
+            return None
+        return [turn for m in moves for turn in SOLVER_MOVES[m]]
+
+    def solve_state(self, state, max_length=24, max_time=0.5):
+        """Solve a cubie state; returns solver moves (see SOLVER_MOVES)."""
+        self.nodes = 0
+        self._state = np.asarray(state)
+        self._max_length = max_length
+        self._deadline = time.perf_counter() + max_time
+        self._best = None
+        twist = int(twist_coord(self._state))
+        flip = int(flip_coord(self._state))
+        slc = int(slice_coord(self._state))
+        # Start at the heuristic so that depth 0 is only tried on a phase 2 cube
+        start = max(self.slice_twist_prune[slc * N_TWIST + twist], self.slice_flip_prune[slc * N_FLIP + flip])
+        path = []
+        depth = start
+        # _max_length drops below every solution found
+        while depth <= self._max_length:
+            if self._phase1(twist, flip, slc, depth, -1, path):
+                break
+            depth += 1
+        return self._best
+
+    def _phase1(self, twist, flip, slc, togo, last_face, path):
+        # Returns True to end the search
+        if togo == 0:
+            # A phase 1 solution ending in a phase 2 move was already tried one level up
+            if path and path[-1] in PHASE2_MOVES:
+                return False
+            return self._start_phase2(path)
+
+        twist_move, flip_move, slice_move = self.twist_move, self.flip_move, self.slice_move
+        slice_twist_prune, slice_flip_prune = self.slice_twist_prune, self.slice_flip_prune
+        allowed = PHASE1_ALLOWED[last_face + 1]
+        self.nodes += len(allowed)
+        for _, m, face in allowed:
+            s = slice_move[slc * 18 + m]
+            t = twist_move[twist * 18 + m]
+            if slice_twist_prune[s * N_TWIST + t] >= togo:
+                continue
+            f = flip_move[flip * 18 + m]
+            if slice_flip_prune[s * N_FLIP + f] >= togo:
+                continue
+            path.append(m)
+            if self._phase1(t, f, s, togo - 1, face, path):
+                return True
+            path.pop()
+        return False
+
+    def _start_phase2(self, path):
+        state = self._state
+        for m in path:
+            state = apply_moves(state, m)
+        corner = int(corner_coord(state))
+        edge = int(ud_edge_coord(state))
+        slice_perm = int(slice_perm_coord(state))
+        last_face = path[-1] // 3 if path else -1
+        start = max(self.corner_slice_prune[corner * N_SLICE_PERM + slice_perm],
+                    self.edge_slice_prune[edge * N_SLICE_PERM + slice_perm])
+        phase1_length = len(path)
+        for depth in range(start, self._max_length - phase1_length + 1):
+            if self._phase2(corner, edge, slice_perm, depth, last_face, path):
+                self._best = path[:]
+                self._max_length = len(path) - 1
+                del path[phase1_length:]
+                break
+        if self._best is None:
+            return False
+        return phase1_length > self._max_length or time.perf_counter() > self._deadline
+
+    def _phase2(self, corner, edge, slice_perm, togo, last_face, path):
+        if togo == 0:
+            return corner == 0 and edge == 0 and slice_perm == 0
+
+        corner_move, ud_edge_move, slice_perm_move = self.corner_move, self.ud_edge_move, self.slice_perm_move
+        corner_slice_prune, edge_slice_prune = self.corner_slice_prune, self.edge_slice_prune
+        allowed = PHASE2_ALLOWED[last_face + 1]
+        self.nodes += len(allowed)
+        for i, m, face in allowed:
+            c = corner_move[corner * 18 + m]
+            s = slice_perm_move[slice_perm * 10 + i]
+            if corner_slice_prune[c * N_SLICE_PERM + s] >= togo:
+                continue
+            e = ud_edge_move[edge * 10 + i]
+            if edge_slice_prune[e * N_SLICE_PERM + s] >= togo:
+                continue
+            path.append(m)
+            if self._phase2(c, e, s, togo - 1, face, path):
+                return True
+            path.pop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the two-phase solver tables")
+    parser.add_argument("--dir", default=TABLE_DIR)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    build(args.dir)
+    print(f"wrote two-phase tables to {args.dir} in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
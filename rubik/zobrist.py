@@ -0,0 +1,206 @@
+"""64-bit Zobrist hashes of grid states and a visited set keyed by them.
+
+The hash of a grid is the XOR of one random 64-bit key per (cell, colour)
+over its stickers, so a move changes it by the keys of the stickers it
+moves only: zobrist_tables.delta() reads the old and new colours of
+those cells (20 of 54 on a 3x3x3 face turn) instead of the whole grid.
+
+Keys come from a fixed seed, so a state hashes the same in every process
+and run. Different states collide with probability about 2^-64 per pair;
+visited_set treats equal hashes as equal states.
+"""
+import functools
+
+import numpy as np
+
+from .cube_nxnxn import move_tables
+from .features import tables_for
+
+ZOBRIST_SEED = 0x52554249  # "RUBI"
+# Colours 0 (padding) .. 6, padded to a power of two: key index = cell * COLOR_SLOTS + colour
+COLOR_SLOTS = 8
+
+
+class zobrist_tables:
+    """nxnxnの展開図のZobristキーと、各回転で動くマスの表"""
+
+    def __init__(self, n):
+        cells = 9 * n * n
+        rng = np.random.default_rng([ZOBRIST_SEED, n])
+        keys = rng.integers(0, 2**64, size=(cells, COLOR_SLOTS), dtype=np.uint64, endpoint=False)
+        # Padding cells and colour 0 get key 0, so they never change a hash
+        keys[:, 0] = 0
+        self.keys = keys.ravel()
+        self.grid_index = tables_for(n).grid_index
+        self._facelet_keys = self.grid_index * COLOR_SLOTS
+
+        # Cells each move writes and the cells they are read from, padded with cell 0 (key 0)
+        perms = move_tables(n).reshape(len(move_tables(n)), cells)
+        moved = [np.flatnonzero(perm != np.arange(cells)) for perm in perms]
+        width = max(len(m) for m in moved)
+        self.moved_cells = np.zeros((len(perms), width), dtype=np.intp)
+        self.source_cells = np.zeros((len(perms), width), dtype=np.intp)
+        for i, (perm, m) in enumerate(zip(perms, moved)):
+            self.moved_cells[i, :len(m)] = m
+            self.source_cells[i, :len(m)] = perm[m]
+        self._moved_keys = self.moved_cells * COLOR_SLOTS
+
+        # Per-move keys: hash ^ move_keys[m] identifies the pair (state, move) (rubik/transitions.py)
+        self.move_keys = rng.integers(0, 2**64, size=len(perms), dtype=np.uint64, endpoint=False)
+        self._move_key_list = self.move_keys.tolist()
+
+        # Python lists for delta_one(): on one grid a short loop beats the numpy call overhead
+        self._key_rows = keys.tolist()
+        self._moved_pairs = [list(zip(m.tolist(), perm[m].tolist())) for perm, m in zip(perms, moved)]
+
+        for table in (self.keys, self.move_keys, self._facelet_keys, self.moved_cells, self.source_cells, self._moved_keys):
+            table.setflags(write=False)
+
+    def hash_grids(self, cubes):
+        """(N,) uint64 hashes of (N, 3n, 3n) grids"""
+        flat = cubes.reshape(len(cubes), -1)
+        return np.bitwise_xor.reduce(self.keys[self._facelet_keys + flat[:, self.grid_index]], axis=1)
+
+    def delta(self, cubes, rotate_indices):
+        """(N,) values to XOR into the hashes of (N, 3n, 3n) grids before they make rotate_indices"""
+        flat = cubes.ravel()
+        rows = (np.arange(len(cubes)) * (flat.size // len(cubes)))[:, None]
+        keys = self._moved_keys[rotate_indices]
+        changed = self.keys.take(keys + flat.take(self.moved_cells[rotate_indices] + rows))
+        changed ^= self.keys.take(keys + flat.take(self.source_cells[rotate_indices] + rows))
+        return np.bitwise_xor.reduce(changed, axis=1)
+
+    def delta_one(self, cube, rotate_index):
+        """delta() of a single grid, as a Python int"""
+        flat = cube.ravel().tolist()
+        rows = self._key_rows
+        delta = 0
+        for cell, source in self._moved_pairs[rotate_index]:
+            row = rows[cell]
+            delta ^= row[flat[cell]] ^ row[flat[source]]
+        return delta
+
+
+@functools.lru_cache(maxsize=None)
+def tables_for_hash(n):
+    return zobrist_tables(n)
+
+
+def state_hashes(cubes):
+    """(N, 3n, 3n) grids -> (N,) uint64 Zobrist hashes"""
+    cubes = np.asarray(cubes)
+    return tables_for_hash(cubes.shape[-1] // 3).hash_grids(cubes)
+
+
+class visited_set:
+    """Zobristハッシュのopen addressing集合 (1状態8バイト、線形探査)
+
+    Hash 0 marks an empty slot, so a state hashing to 0 is stored as 1.
+    The table doubles when it gets fuller than max_load.
+    """
+
+    def __init__(self, capacity=1 << 16, max_load=0.5):
+        self.max_load = max_load
+        self.count = 0
+        self._table = np.zeros(1 << max(int(capacity) - 1, 1).bit_length(), dtype=np.uint64)
+
+    @staticmethod
+    def _keys(hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64).ravel()
+        return np.where(hashes == 0, np.uint64(1), hashes)
+
+    def _grow(self, extra):
+        size = len(self._table)
+        while self.count + extra > size * self.max_load:
+            size *= 2
+        if size != len(self._table):
+            old = self._table[self._table != 0]
+            self._table = np.zeros(size, dtype=np.uint64)
+            self.count = 0
+            self._insert(old)
+
+    def _insert(self, keys):
+        # keys: distinct, nonzero. Returns a mask of the keys that were not in the table yet
+        mask = np.uint64(len(self._table) - 1)
+        added = np.zeros(len(keys), dtype=bool)
+        pending = np.arange(len(keys))
+        slots = keys & mask
+        while len(pending):
+            current = self._table[slots.astype(np.intp)]
+            empty = current == 0
+            # Keys found in place are done; of several keys probing one empty slot, the first wins
+            _, first = np.unique(slots[empty], return_index=True)
+            winners = np.flatnonzero(empty)[first]
+            self._table[slots[winners].astype(np.intp)] = keys[pending[winners]]
+            added[pending[winners]] = True
+            moving = ~empty & (current != keys[pending])
+            moving[np.flatnonzero(empty)] = True
+            moving[winners] = False
+            pending = pending[moving]
+            slots = (slots[moving] + np.uint64(1)) & mask
+        self.count += int(added.sum())
+        return added
+
+    def add(self, state_hash):
+        """Add one hash; True if it was new"""
+        key = int(state_hash) or 1
+        self._grow(1)
+        table = self._table
+        mask = len(table) - 1
+        slot = key & mask
+        while True:
+            current = table.item(slot)
+            if current == key:
+                return False
+            if current == 0:
+                table[slot] = key
+                self.count += 1
+                return True
+            slot = (slot + 1) & mask
+
+    def add_many(self, hashes):
+        """Add a batch of hashes; (N,) bool mask of the ones not seen before (first occurrence only)"""
+        keys = self._keys(hashes)
+        unique, first = np.unique(keys, return_index=True)
+        self._grow(len(unique))
+        added = np.zeros(len(keys), dtype=bool)
+        added[first] = self._insert(unique)
+        return added
+
+    def contains_many(self, hashes):
+        keys = self._keys(hashes)
+        mask = np.uint64(len(self._table) - 1)
+        found = np.zeros(len(keys), dtype=bool)
+        pending = np.arange(len(keys))
+        slots = keys & mask
+        while len(pending):
+            current = self._table[slots.astype(np.intp)]
+            found[pending[current == keys[pending]]] = True
+            probing = (current != 0) & (current != keys[pending])
+            pending = pending[probing]
+            slots = (slots[probing] + np.uint64(1)) & mask
+        return found
+
+    def __contains__(self, state_hash):
+        key = int(state_hash) or 1
+        table = self._table
+        mask = len(table) - 1
+        slot = key & mask
+        while True:
+            current = table.item(slot)
+            if current == key:
+                return True
+            if current == 0:
+                return False
+            slot = (slot + 1) & mask
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def nbytes(self):
+        return self._table.nbytes
+
+    def clear(self):
+        self._table[...] = 0
+        self.count = 0
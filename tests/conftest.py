@@ -0,0 +1,11 @@
+import pytest
+
+from rubik.distance_2x2x2 import distance_table_2x2x2
+
+
+@pytest.fixture(scope="session")
+def table_path(tmp_path_factory):
+    """2x2x2 distance table built once into a temporary directory"""
+    path = str(tmp_path_factory.mktemp("tables") / "distance_2x2x2.bin")
+    distance_table_2x2x2(path)
+    return path
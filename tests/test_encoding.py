@@ -0,0 +1,34 @@
+"""The encoders on grids that are not valid cubes."""
+import numpy as np
+import pytest
+
+from rubik import rubik_3x3x3
+from rubik.encoding import cubie_encoder, facelet_encoder
+
+
+def test_encode_matches_encode_states():
+    cube = rubik_3x3x3(shuffle_num=20)
+    encoder = cubie_encoder(3)
+    expected = encoder.encode_states(encoder.tables.from_cube(cube.cube[None]))
+    np.testing.assert_array_equal(encoder.encode(cube.cube[None]), expected)
+
+
+def test_encode_rejects_invalid_grid():
+    cube = rubik_3x3x3(shuffle_num=0)
+    grid = cube.cube.copy()
+    # The URF corner with two U stickers is no cubie
+    grid[3, 5] = grid[2, 5]
+    with pytest.raises(ValueError):
+        cubie_encoder(3).encode(grid[None])
+
+
+@pytest.mark.parametrize("encoder", [facelet_encoder, cubie_encoder])
+@pytest.mark.parametrize("colour", [0, 7])
+def test_encode_rejects_colour_out_of_range(encoder, colour):
+    cube = rubik_3x3x3(shuffle_num=0)
+    for y, x in [(3, 3), (8, 8)]:
+        # The first sticker of F and the last sticker of B
+        grid = cube.cube.copy()
+        grid[y, x] = colour
+        with pytest.raises(ValueError):
+            encoder(3).encode(grid[None])
@@ -0,0 +1,21 @@
+"""A transition_cache on env.batch must not change what the env does."""
+import numpy as np
+
+from rubik.env import rubik_vector_env
+from rubik.transitions import transition_cache
+
+
+def test_cached_env_matches_uncached():
+    plain = rubik_vector_env(16, scramble_depth=3, max_steps=6, seed=0)
+    cached = rubik_vector_env(16, scramble_depth=3, max_steps=6, seed=0)
+    cached.batch.transitions = transition_cache(3, max_bytes=1 << 20)
+    np.testing.assert_array_equal(plain.reset(), cached.reset())
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        actions = rng.integers(0, 12, 16)
+        obs, reward, done, _ = plain.step(actions)
+        cached_obs, cached_reward, cached_done, _ = cached.step(actions)
+        np.testing.assert_array_equal(obs, cached_obs)
+        np.testing.assert_array_equal(reward, cached_reward)
+        np.testing.assert_array_equal(done, cached_done)
+    assert cached.batch.transitions.hits > 0
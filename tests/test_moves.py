@@ -0,0 +1,133 @@
+"""MOVE_PERMS against the hand-written index lists of the original rubik_3x3x3 / rubik_2x2x2 methods."""
+import numpy as np
+import pytest
+
+from rubik import cube_2x2x2, cube_3x3x3
+
+# (y_ind, x_ind, y_pri, x_pri, top-left of the turned face, rot90 k) of every
+# update() index, copied from the original R() ... B():
+#     cube[y_pri, x_pri] = cube[y_ind, x_ind]
+#     cube[face] = np.rot90(cube[face], k)
+BASELINE_3x3x3 = [
+    # R
+    ([3, 4, 5, 6, 7, 8, 8, 7, 6, 0, 1, 2], [5, 5, 5, 5, 5, 5, 8, 8, 8, 5, 5, 5],
+     [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], [5, 5, 5, 5, 5, 5, 5, 5, 5, 8, 8, 8], (3, 6), -1),
+    # Ri
+    ([8, 7, 6, 0, 1, 2, 3, 4, 5, 6, 7, 8], [8, 8, 8, 5, 5, 5, 5, 5, 5, 5, 5, 5],
+     [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], [5, 5, 5, 5, 5, 5, 5, 5, 5, 8, 8, 8], (3, 6), 1),
+    # Li
+    ([3, 4, 5, 6, 7, 8, 8, 7, 6, 0, 1, 2], [3, 3, 3, 3, 3, 3, 6, 6, 6, 3, 3, 3],
+     [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], [3, 3, 3, 3, 3, 3, 3, 3, 3, 6, 6, 6], (3, 0), 1),
+    # L
+    ([8, 7, 6, 0, 1, 2, 3, 4, 5, 6, 7, 8], [6, 6, 6, 3, 3, 3, 3, 3, 3, 3, 3, 3],
+     [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], [3, 3, 3, 3, 3, 3, 3, 3, 3, 6, 6, 6], (3, 0), -1),
+    # Ui
+    ([6, 6, 6, 3, 3, 3, 3, 3, 3, 3, 3, 3], [8, 7, 6, 0, 1, 2, 3, 4, 5, 6, 7, 8],
+     [3, 3, 3, 3, 3, 3, 3, 3, 3, 6, 6, 6], [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], (0, 3), 1),
+    # U
+    ([3, 3, 3, 3, 3, 3, 6, 6, 6, 3, 3, 3], [3, 4, 5, 6, 7, 8, 8, 7, 6, 0, 1, 2],
+     [3, 3, 3, 3, 3, 3, 3, 3, 3, 6, 6, 6], [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], (0, 3), -1),
+    # D
+    ([8, 8, 8, 5, 5, 5, 5, 5, 5, 5, 5, 5], [8, 7, 6, 0, 1, 2, 3, 4, 5, 6, 7, 8],
+     [5, 5, 5, 5, 5, 5, 5, 5, 5, 8, 8, 8], [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], (6, 3), -1),
+    # Di
+    ([5, 5, 5, 5, 5, 5, 8, 8, 8, 5, 5, 5], [3, 4, 5, 6, 7, 8, 8, 7, 6, 0, 1, 2],
+     [5, 5, 5, 5, 5, 5, 5, 5, 5, 8, 8, 8], [0, 1, 2, 3, 4, 5, 6, 7, 8, 8, 7, 6], (6, 3), 1),
+    # F
+    ([5, 4, 3, 2, 2, 2, 3, 4, 5, 6, 6, 6], [2, 2, 2, 3, 4, 5, 6, 6, 6, 5, 4, 3],
+     [2, 2, 2, 3, 4, 5, 6, 6, 6, 5, 4, 3], [3, 4, 5, 6, 6, 6, 5, 4, 3, 2, 2, 2], (3, 3), -1),
+    # Fi
+    ([3, 4, 5, 6, 6, 6, 5, 4, 3, 2, 2, 2], [6, 6, 6, 5, 4, 3, 2, 2, 2, 3, 4, 5],
+     [2, 2, 2, 3, 4, 5, 6, 6, 6, 5, 4, 3], [3, 4, 5, 6, 6, 6, 5, 4, 3, 2, 2, 2], (3, 3), 1),
+    # Bi
+    ([5, 4, 3, 0, 0, 0, 3, 4, 5, 8, 8, 8], [0, 0, 0, 3, 4, 5, 8, 8, 8, 5, 4, 3],
+     [0, 0, 0, 3, 4, 5, 8, 8, 8, 5, 4, 3], [3, 4, 5, 8, 8, 8, 5, 4, 3, 0, 0, 0], (6, 6), -1),
+    # B
+    ([3, 4, 5, 8, 8, 8, 5, 4, 3, 0, 0, 0], [8, 8, 8, 5, 4, 3, 0, 0, 0, 3, 4, 5],
+     [0, 0, 0, 3, 4, 5, 8, 8, 8, 5, 4, 3], [3, 4, 5, 8, 8, 8, 5, 4, 3, 0, 0, 0], (6, 6), 1),
+]
+
+BASELINE_2x2x2 = [
+    # R
+    ([2, 3, 4, 5, 5, 4, 0, 1], [3, 3, 3, 3, 5, 5, 3, 3],
+     [0, 1, 2, 3, 4, 5, 5, 4], [3, 3, 3, 3, 3, 3, 5, 5], (2, 4), -1),
+    # Ri
+    ([5, 4, 0, 1, 2, 3, 4, 5], [5, 5, 3, 3, 3, 3, 3, 3],
+     [0, 1, 2, 3, 4, 5, 5, 4], [3, 3, 3, 3, 3, 3, 5, 5], (2, 4), 1),
+    # Li
+    ([2, 3, 4, 5, 5, 4, 0, 1], [2, 2, 2, 2, 4, 4, 2, 2],
+     [0, 1, 2, 3, 4, 5, 5, 4], [2, 2, 2, 2, 2, 2, 4, 4], (2, 0), 1),
+    # L
+    ([5, 4, 0, 1, 2, 3, 4, 5], [4, 4, 2, 2, 2, 2, 2, 2],
+     [0, 1, 2, 3, 4, 5, 5, 4], [2, 2, 2, 2, 2, 2, 4, 4], (2, 0), -1),
+    # Ui
+    ([4, 4, 2, 2, 2, 2, 2, 2], [5, 4, 0, 1, 2, 3, 4, 5],
+     [2, 2, 2, 2, 2, 2, 4, 4], [0, 1, 2, 3, 4, 5, 5, 4], (0, 2), 1),
+    # U
+    ([2, 2, 2, 2, 4, 4, 2, 2], [2, 3, 4, 5, 5, 4, 0, 1],
+     [2, 2, 2, 2, 2, 2, 4, 4], [0, 1, 2, 3, 4, 5, 5, 4], (0, 2), -1),
+    # D
+    ([5, 5, 3, 3, 3, 3, 3, 3], [5, 4, 0, 1, 2, 3, 4, 5],
+     [3, 3, 3, 3, 3, 3, 5, 5], [0, 1, 2, 3, 4, 5, 5, 4], (4, 2), -1),
+    # Di
+    ([3, 3, 3, 3, 5, 5, 3, 3], [2, 3, 4, 5, 5, 4, 0, 1],
+     [3, 3, 3, 3, 3, 3, 5, 5], [0, 1, 2, 3, 4, 5, 5, 4], (4, 2), 1),
+    # F
+    ([3, 2, 1, 1, 2, 3, 4, 4], [1, 1, 2, 3, 4, 4, 3, 2],
+     [1, 1, 2, 3, 4, 4, 3, 2], [2, 3, 4, 4, 3, 2, 1, 1], (2, 2), -1),
+    # Fi
+    ([2, 3, 4, 4, 3, 2, 1, 1], [4, 4, 3, 2, 1, 1, 2, 3],
+     [1, 1, 2, 3, 4, 4, 3, 2], [2, 3, 4, 4, 3, 2, 1, 1], (2, 2), 1),
+    # Bi
+    ([3, 2, 0, 0, 2, 3, 5, 5], [0, 0, 2, 3, 5, 5, 3, 2],
+     [0, 0, 2, 3, 5, 5, 3, 2], [2, 3, 5, 5, 3, 2, 0, 0], (4, 4), -1),
+    # B
+    ([2, 3, 5, 5, 3, 2, 0, 0], [5, 5, 3, 2, 0, 0, 2, 3],
+     [0, 0, 2, 3, 5, 5, 3, 2], [2, 3, 5, 5, 3, 2, 0, 0], (4, 4), 1),
+]
+
+
+CASES = [(3, cube_3x3x3.MOVE_PERMS, BASELINE_3x3x3), (2, cube_2x2x2.MOVE_PERMS, BASELINE_2x2x2)]
+
+
+def baseline_move(cube, spec, n):
+    y_ind, x_ind, y_pri, x_pri, (row, col), k = spec
+    cube = cube.copy()
+    cube[y_pri, x_pri] = cube[y_ind, x_ind]
+    face = (slice(row, row + n), slice(col, col + n))
+    cube[face] = np.rot90(cube[face], k=k)
+    return cube
+
+
+@pytest.mark.parametrize("n, perms, baseline", CASES)
+def test_move_perms_match_baseline(n, perms, baseline):
+    # Every cell holds its own index, so the moved grid is the permutation itself
+    cells = np.arange(9 * n * n).reshape(3 * n, 3 * n)
+    assert len(perms) == len(baseline) == 12
+    for m, spec in enumerate(baseline):
+        np.testing.assert_array_equal(perms[m], baseline_move(cells, spec, n), err_msg=f"move {m}")
+
+
+@pytest.mark.parametrize("n, perms, baseline", CASES)
+def test_four_turns_and_inverse_are_identity(n, perms, baseline):
+    identity = np.arange(9 * n * n).reshape(3 * n, 3 * n)
+    for m in range(12):
+        cube = identity
+        for _ in range(4):
+            cube = cube.ravel()[perms[m]]
+        np.testing.assert_array_equal(cube, identity, err_msg=f"4 x move {m}")
+        # update() index m ^ 1 undoes m
+        undone = cube.ravel()[perms[m]].ravel()[perms[m ^ 1]]
+        np.testing.assert_array_equal(undone, identity, err_msg=f"move {m} then {m ^ 1}")
+
+
+@pytest.mark.parametrize("n, perms, baseline", CASES)
+def test_update_matches_baseline_on_scrambles(n, perms, baseline):
+    cube_class = cube_3x3x3.rubik_3x3x3 if n == 3 else cube_2x2x2.rubik_2x2x2
+    rng = np.random.default_rng(n)
+    cube = cube_class(shuffle_num=0)
+    expected = cube.cube.copy()
+    for m in rng.integers(0, 12, 300).tolist():
+        cube.update(m)
+        expected = baseline_move(expected, baseline[m], n)
+        np.testing.assert_array_equal(cube.cube, expected)
@@ -0,0 +1,23 @@
+"""parse_moves range-checks update() indices against the moves of the cube."""
+import pytest
+
+from rubik.cube_nxnxn import compile_sequence, move_tables
+from rubik.notation import parse_moves
+
+
+def test_parse_moves_accepts_strings_and_indices():
+    assert parse_moves("R U2 F'") == (0, 5, 5, 9)
+    assert parse_moves([0, 11]) == (0, 11)
+
+
+@pytest.mark.parametrize("moves", [[-1], [12], [0, 99]])
+def test_parse_moves_rejects_indices_out_of_range(moves):
+    with pytest.raises(ValueError):
+        parse_moves(moves)
+
+
+def test_compile_sequence_allows_the_slices_of_larger_cubes():
+    last = len(move_tables(4)) - 1
+    assert compile_sequence(4, [12, last]).shape == (12, 12)
+    with pytest.raises(ValueError):
+        compile_sequence(4, [last + 1])
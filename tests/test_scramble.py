@@ -0,0 +1,24 @@
+"""Scrambles spend every move: the cube ends as far from solved as the scramble is long."""
+import numpy as np
+import pytest
+
+from rubik.coord import encode_2x2x2
+from rubik.cubie import TABLES_2x2x2
+from rubik.distance_2x2x2 import distance_table_2x2x2
+from rubik.scramble import scramble_moves
+
+
+def scrambled_distances(table_path, depth, count=5000):
+    states = np.broadcast_to(TABLES_2x2x2.solved_state, (count, TABLES_2x2x2.state_size)).copy()
+    for moves in scramble_moves(0, count, depth, 2).T:
+        states = TABLES_2x2x2.move(states, moves)
+    return distance_table_2x2x2(table_path, build_missing=False).distance(encode_2x2x2(states))
+
+
+@pytest.mark.parametrize("depth", [1, 2, 3, 4, 5])
+def test_2x2x2_short_scrambles_are_exact(table_path, depth):
+    assert (scrambled_distances(table_path, depth) == depth).all()
+
+
+def test_2x2x2_scrambles_are_not_solved(table_path):
+    assert (scrambled_distances(table_path, 8) > 0).all()
@@ -0,0 +1,58 @@
+"""One definition of solved: every face shows one colour (a 2x2x2 may be turned as a whole)."""
+import numpy as np
+import pytest
+
+from rubik import rubik_2x2x2, rubik_2x2x2_batch, rubik_2x2x2_cubie, rubik_3x3x3, rubik_3x3x3_batch
+from rubik.distance_2x2x2 import distance_table_2x2x2
+from rubik.optimal import optimal_solver_2x2x2
+from rubik.scramble import scramble_moves
+
+# R Li: the 2x2x2 turned as a whole about the R/L axis
+WHOLE_CUBE_X = [0, 2]
+
+
+def test_whole_cube_rotation_is_solved():
+    cube = rubik_2x2x2(shuffle_num=0)
+    for m in WHOLE_CUBE_X:
+        cube.update(m)
+    assert not (cube.cube == cube.solved_cube).all()
+    assert cube.is_solved()
+    assert rubik_2x2x2_cubie.from_cube(cube.cube).is_solved()
+
+    batch = rubik_2x2x2_batch(3, shuffle_num=0)
+    for m in WHOLE_CUBE_X:
+        batch.update(np.array([m, m, 1]))
+    assert batch.is_solved().tolist() == [True, True, False]
+
+
+def test_3x3x3_is_solved():
+    cube = rubik_3x3x3(shuffle_num=0)
+    assert cube.is_solved()
+    cube.update(0)
+    assert not cube.is_solved()
+    batch = rubik_3x3x3_batch(4, shuffle_num=0)
+    batch.update(np.array([0, 1, 2, 3]))
+    batch.update(np.array([1, 1, 3, 3]))
+    assert batch.is_solved().tolist() == [True, False, True, False]
+
+
+@pytest.mark.parametrize("solver", ["distance", "optimal"])
+def test_2x2x2_solutions_are_solved(table_path, solver):
+    if solver == "distance":
+        solve = distance_table_2x2x2(table_path, build_missing=False).solve
+    else:
+        solve = optimal_solver_2x2x2(table_path, build_missing=False).solve
+    scrambles = scramble_moves(0, 50, 20, 2)
+    batch = rubik_2x2x2_batch(len(scrambles), shuffle_num=0)
+    for moves in scrambles.T:
+        batch.update(moves)
+    for i, moves in enumerate(scrambles):
+        cube = rubik_2x2x2(shuffle_num=0)
+        for m in moves.tolist():
+            cube.update(m)
+        np.testing.assert_array_equal(cube.cube, batch.cubes[i])
+        for m in solve(cube.cube):
+            cube.update(m)
+        assert cube.is_solved()
+        batch.set_cubes([i], cube.cube[None])
+    assert batch.is_solved().all()
@@ -0,0 +1,32 @@
+"""state_hash() stays equal to a fresh hash of the grids whatever writes them."""
+import numpy as np
+
+from rubik import rubik_3x3x3, rubik_3x3x3_batch
+from rubik.transitions import transition_cache
+from rubik.zobrist import tables_for_hash
+
+
+def fresh_hashes(cubes):
+    return tables_for_hash(3).hash_grids(cubes)
+
+
+def test_batch_hashes_follow_every_write():
+    rng = np.random.default_rng(0)
+    batch = rubik_3x3x3_batch(16, shuffle_num=5, seed=0)
+    batch.transitions = transition_cache(3, max_bytes=64 << 10)
+    batch.state_hash()
+    for step in range(50):
+        batch.update(rng.integers(0, 12, 16))
+        if step % 10 == 3:
+            batch.reset(rng.random(16) < 0.3)
+        if step % 10 == 7:
+            other = rubik_3x3x3_batch(3, shuffle_num=8, seed=step)
+            batch.set_cubes([1, 5, 9], other.cubes)
+        np.testing.assert_array_equal(batch.state_hash(), fresh_hashes(batch.cubes))
+
+
+def test_single_hash_follows_set_cube():
+    cube = rubik_3x3x3(shuffle_num=10)
+    cube.state_hash()
+    cube.set_cube(rubik_3x3x3(shuffle_num=10).cube)
+    assert cube.state_hash() == fresh_hashes(cube.cube[None])[0]
@@ -0,0 +1,30 @@
+import pickle
+
+from rubik.geometry import solved_grid
+from rubik.trajectory import convert_pickles, log_path, read_log
+
+
+def _save(directory, name, grid):
+    with open(directory / name, "wb") as f:
+        pickle.dump(grid, f)
+
+
+def test_convert_pickles_twice_adds_nothing(tmp_path):
+    day = tmp_path / "20250101"
+    day.mkdir()
+    scrambled = solved_grid(3)
+    scrambled[3, 3] = 1
+    _save(day, "cube_120000.pkl", solved_grid(3))
+    _save(day, "cube_120001.pkl", scrambled)
+    _save(day, "cube_120002.pkl", solved_grid(2))
+    pattern = str(tmp_path / "*" / "cube_*.pkl")
+    log_3x3x3, log_2x2x2 = log_path(3, str(tmp_path)), log_path(2, str(tmp_path))
+
+    assert convert_pickles(pattern, str(tmp_path)) == {log_3x3x3: 2, log_2x2x2: 1}
+    assert convert_pickles(pattern, str(tmp_path)) == {log_3x3x3: 0, log_2x2x2: 0}
+    assert len(read_log(log_3x3x3)) == 2
+    # The pickles stay where they are; a new save is picked up on the next run
+    assert (day / "cube_120000.pkl").exists()
+    _save(day, "cube_120003.pkl", scrambled)
+    assert convert_pickles(pattern, str(tmp_path)) == {log_3x3x3: 1, log_2x2x2: 0}
+    assert len(read_log(log_3x3x3)) == 3
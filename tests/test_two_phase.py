@@ -0,0 +1,27 @@
+"""two_phase_solver shortens its first solution: short scrambles get short solutions."""
+import numpy as np
+import pytest
+
+from rubik.cubie import TABLES_3x3x3
+from rubik.scramble import scramble_moves
+from rubik.two_phase import build, two_phase_solver
+
+
+@pytest.fixture(scope="module")
+def solver(tmp_path_factory):
+    table_dir = str(tmp_path_factory.mktemp("two_phase"))
+    build(table_dir)
+    return two_phase_solver(table_dir, build_missing=False)
+
+
+@pytest.mark.parametrize("depth", [1, 2, 4])
+def test_short_scrambles_get_short_solutions(solver, depth):
+    for moves in scramble_moves(0, 20, depth):
+        state = TABLES_3x3x3.solved_state
+        for m in moves:
+            state = TABLES_3x3x3.move(state, m)
+        solution = solver.solve(TABLES_3x3x3.to_cube(state))
+        assert len(solution) <= depth
+        for m in solution:
+            state = TABLES_3x3x3.move(state, m)
+        np.testing.assert_array_equal(state, TABLES_3x3x3.solved_state)